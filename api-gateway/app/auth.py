@@ -1,18 +1,149 @@
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 import httpx
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from jose import ExpiredSignatureError, JWTError, jwt
 
-# URL сервиса пользователей (лучше брать из переменных окружения)
-USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
+from app.http_client import USER_SERVICE_URL, get_http_client
+from app.token_cache import TokenCache
+
+# Общий с сервисом пользователей ключ подписи токенов. Если не задан,
+# токены проверяются только через сервис пользователей.
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_ALGORITHM = "HS256"
+# Разрешить ли проверку через сервис пользователей для токенов, которые
+# не удалось проверить локально (нет ключа или в токене нет user_id)
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "true").lower() == "true"
+
+# Кеш результатов проверки токенов через сервис пользователей
+token_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", "60")),
+)
+
+# Версии токенов пользователей (claim tv), по user_id. Токен, отозванный
+# сменой пароля, принимается не дольше TOKEN_VERSION_TTL секунд
+TOKEN_VERSION_TTL = float(os.getenv("TOKEN_VERSION_TTL", "5"))
+token_version_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl=TOKEN_VERSION_TTL,
+)
 
 # Схема OAuth2 для получения токена
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/token")
 
 
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def decode_token_locally(token: str) -> Optional[Tuple[Dict[str, Any], int]]:
+    """
+    Проверяет подпись и срок действия токена без обращения к сервису пользователей.
+
+    Версия токена (claim tv) здесь только читается; сверяет её validate_token.
+
+    Args:
+        token: Токен доступа.
+
+    Returns:
+        Данные пользователя из claims (id и login) и версию токена (0, если
+        claim tv нет) или None, если локальная проверка невозможна: ключ
+        не настроен или в токене нет user_id.
+
+    Raises:
+        HTTPException: Если токен просрочен или подпись неверна.
+    """
+    if not JWT_SECRET_KEY:
+        return None
+    try:
+        claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except ExpiredSignatureError:
+        raise _unauthorized("Invalid token: Token has expired")
+    except JWTError:
+        raise _unauthorized("Invalid token")
+
+    user_id = claims.get("user_id")
+    if not user_id:
+        return None
+    return {"id": user_id, "login": claims.get("sub")}, claims.get("tv", 0)
+
+
 async def validate_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """
+    Валидирует токен доступа локально, по подписи и claims.
+
+    Версия токена сверяется с текущей версией пользователя из
+    token_version_cache, так что после смены пароля старые токены
+    отклоняются. Если локальная проверка невозможна и разрешён AUTH_REMOTE_FALLBACK,
+    токен проверяется через сервис пользователей; результат кешируется
+    в token_cache.
+
+    Args:
+        token: Токен доступа из заголовка Authorization: Bearer.
+
+    Returns:
+        Словарь с данными пользователя; гарантированно содержит id.
+
+    Raises:
+        HTTPException: Если токен невалиден или сервис пользователей недоступен.
+    """
+    decoded = decode_token_locally(token)
+    if decoded is not None:
+        user_data, token_version = decoded
+        if token_version != await get_token_version(user_data["id"]):
+            raise _unauthorized("Invalid token: Token has been revoked")
+        return user_data
+    if not AUTH_REMOTE_FALLBACK:
+        raise _unauthorized("Invalid token")
+    return await token_cache.get_or_fetch(token, fetch_current_user)
+
+
+async def get_token_version(user_id: str) -> int:
+    """Текущая версия токенов пользователя, с кешированием на TOKEN_VERSION_TTL."""
+    result = await token_version_cache.get_or_fetch(user_id, fetch_token_version)
+    return result["token_version"]
+
+
+async def fetch_token_version(user_id: str) -> Dict[str, Any]:
+    """
+    Запрашивает версию токенов пользователя у сервиса пользователей.
+
+    Raises:
+        HTTPException: 401, если пользователя нет; 503, если сервис
+            пользователей недоступен.
+    """
+    try:
+        response = await get_http_client().get(
+            f"{USER_SERVICE_URL}/internal/users/{user_id}/token-version"
+        )
+        response.raise_for_status()
+    except httpx.RequestError as exc:
+        raise HTTPException(
+            status_code=503, detail=f"User service connection error: {exc}"
+        )
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == 404:
+            raise _unauthorized("Invalid token")
+        raise HTTPException(
+            status_code=503,
+            detail=f"User service error: Status {exc.response.status_code}",
+        )
+    return response.json()
+
+
+async def get_current_user_profile(
+    token: str = Depends(oauth2_scheme),
+) -> Dict[str, Any]:
+    """Возвращает полный профиль пользователя из сервиса пользователей."""
+    return await fetch_current_user(token)
+
+
+async def fetch_current_user(token: str) -> Dict[str, Any]:
     """
     Валидирует токен доступа, обращаясь к эндпоинту /me сервиса пользователей.
 
@@ -25,34 +156,32 @@ async def validate_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     Raises:
         HTTPException: Если токен невалиден или сервис пользователей недоступен.
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            print(f"{USER_SERVICE_URL}/me")
-            response = await client.get(
-                f"{USER_SERVICE_URL}/me", headers={"Authorization": f"Bearer {token}"}
-            )
-            response.raise_for_status()  # Проверяем статус ответа (4xx, 5xx)
-        except httpx.RequestError as exc:
-            # Ошибка сети или соединения с сервисом пользователей
-            raise HTTPException(
-                status_code=503, detail=f"User service connection error: {exc}"
-            )
-        except httpx.HTTPStatusError as exc:
-            # Ошибка от сервиса пользователей (например, 401 Unauthorized)
-            status_code = exc.response.status_code
-            detail = "Invalid token"
-            if status_code == 401:
-                # Можно попытаться получить детали из ответа сервиса пользователей
-                try:
-                    error_detail = exc.response.json().get("detail")
-                    if error_detail:
-                        detail = f"Invalid token: {error_detail}"
-                except Exception:
-                    pass  # Оставляем detail = "Invalid token"
-            elif status_code >= 500:
-                detail = f"User service error: Status {status_code}"
-
-            raise HTTPException(status_code=status_code, detail=detail)
+    try:
+        response = await get_http_client().get(
+            f"{USER_SERVICE_URL}/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        response.raise_for_status()  # Проверяем статус ответа (4xx, 5xx)
+    except httpx.RequestError as exc:
+        # Ошибка сети или соединения с сервисом пользователей
+        raise HTTPException(
+            status_code=503, detail=f"User service connection error: {exc}"
+        )
+    except httpx.HTTPStatusError as exc:
+        # Ошибка от сервиса пользователей (например, 401 Unauthorized)
+        status_code = exc.response.status_code
+        detail = "Invalid token"
+        if status_code == 401:
+            # Можно попытаться получить детали из ответа сервиса пользователей
+            try:
+                error_detail = exc.response.json().get("detail")
+                if error_detail:
+                    detail = f"Invalid token: {error_detail}"
+            except Exception:
+                pass  # Оставляем detail = "Invalid token"
+        elif status_code >= 500:
+            detail = f"User service error: Status {status_code}"
+
+        raise HTTPException(status_code=status_code, detail=detail)
 
     # Если все успешно, возвращаем данные пользователя
     return response.json()
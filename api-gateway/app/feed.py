@@ -0,0 +1,57 @@
+from typing import Any, Dict, List, Optional
+
+import grpc
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+
+from app.auth import validate_token
+from app.posts import (
+    POST_SERVICE_TIMEOUT,
+    PostJSONResponse,
+    PostResponse,
+    get_post_service_stub,
+    handle_grpc_error,
+    post_json,
+)
+from app.proto import post_service_pb2, post_service_pb2_grpc
+
+router = APIRouter(prefix="/api/v1/feed", tags=["feed"])
+
+
+class FeedResponse(BaseModel):
+    posts: List[PostResponse]
+    # Передаётся обратно как ?cursor= за следующей страницей; None на последней
+    next_cursor: Optional[str] = None
+
+
+@router.get("", response_model=FeedResponse)
+async def get_feed(
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    user_data: Dict[str, Any] = Depends(validate_token),
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    """
+    Домашняя лента: посты тех, на кого подписан пользователь, от новых к старым.
+
+    Лента заранее разложена по подпискам при создании постов, поэтому
+    страница читается из одной партиции, а не собирается по всем авторам.
+    """
+    user_id = user_data.get("id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data"
+        )
+    request = post_service_pb2.GetFeedRequest(
+        user_id=str(user_id), page_size=page_size, cursor=cursor or ""
+    )
+    try:
+        response = await stub.GetFeed(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {
+                "posts": [post_json(p) for p in response.posts],
+                "next_cursor": response.next_cursor or None,
+            }
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
@@ -0,0 +1,96 @@
+import itertools
+import time
+from typing import List, Sequence, Tuple
+
+import grpc
+
+from app.proto import post_service_pb2_grpc
+
+
+class ChannelPool:
+    """
+    Пул долгоживущих асинхронных gRPC-каналов (grpc.aio) к сервису постов.
+
+    Каналы открываются один раз при старте приложения внутри его event loop
+    и переиспользуются всеми запросами, стабы выдаются по кругу
+    (round-robin). Каналы в состоянии TRANSIENT_FAILURE пропускаются; если
+    недоступны все, канал пересоздаётся (не чаще, чем раз в
+    reconnect_interval секунд), а закрытый канал пересоздаётся сразу.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        size: int = 4,
+        options: Sequence[Tuple[str, object]] = (),
+        reconnect_interval: float = 5.0,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.target = target
+        self.size = size
+        self.options = list(options)
+        self.reconnect_interval = reconnect_interval
+
+        self._channels: List[grpc.aio.Channel] = []
+        self._stubs: List[post_service_pb2_grpc.PostServiceStub] = []
+        self._connected_at: List[float] = []
+        self._counter = itertools.count()
+
+    @property
+    def is_open(self) -> bool:
+        return bool(self._channels)
+
+    def open(self):
+        if self._channels:
+            return
+        self._channels = [None] * self.size
+        self._stubs = [None] * self.size
+        self._connected_at = [0.0] * self.size
+        for index in range(self.size):
+            self._connect(index)
+
+    async def close(self):
+        channels = self._channels
+        self._channels, self._stubs, self._connected_at = [], [], []
+        for channel in channels:
+            await channel.close()
+
+    async def get_stub(self) -> post_service_pb2_grpc.PostServiceStub:
+        if not self._channels:
+            raise RuntimeError("Channel pool is not open")
+
+        start = next(self._counter)
+        for offset in range(self.size):
+            index = (start + offset) % self.size
+            state = self._channels[index].get_state()
+            if state == grpc.ChannelConnectivity.SHUTDOWN:
+                await self._reconnect(index, force=True)
+                return self._stubs[index]
+            if state != grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+                return self._stubs[index]
+
+        # Все каналы недоступны: пересоздаём текущий, чтобы заново
+        # разрешить адрес и установить соединение
+        index = start % self.size
+        await self._reconnect(index)
+        return self._stubs[index]
+
+    def _create_channel(self) -> grpc.aio.Channel:
+        return grpc.aio.insecure_channel(self.target, options=self.options)
+
+    def _connect(self, index: int):
+        channel = self._create_channel()
+        # Начинаем подключение сразу, чтобы первый запрос шёл по тёплому каналу
+        channel.get_state(try_to_connect=True)
+        self._channels[index] = channel
+        self._stubs[index] = post_service_pb2_grpc.PostServiceStub(channel)
+        self._connected_at[index] = time.monotonic()
+
+    async def _reconnect(self, index: int, force: bool = False):
+        elapsed = time.monotonic() - self._connected_at[index]
+        if not force and elapsed < self.reconnect_interval:
+            return
+        old_channel = self._channels[index]
+        self._connect(index)
+        await old_channel.close()
@@ -0,0 +1,53 @@
+import os
+from typing import Optional
+
+import httpx
+
+# URL сервиса пользователей (лучше брать из переменных окружения)
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
+
+# Настройки пула соединений к сервису пользователей
+USER_SERVICE_MAX_CONNECTIONS = int(os.getenv("USER_SERVICE_MAX_CONNECTIONS", "100"))
+USER_SERVICE_MAX_KEEPALIVE = int(os.getenv("USER_SERVICE_MAX_KEEPALIVE", "20"))
+USER_SERVICE_KEEPALIVE_EXPIRY = float(os.getenv("USER_SERVICE_KEEPALIVE_EXPIRY", "30"))
+USER_SERVICE_TIMEOUT = float(os.getenv("USER_SERVICE_TIMEOUT", "5"))
+USER_SERVICE_CONNECT_TIMEOUT = float(os.getenv("USER_SERVICE_CONNECT_TIMEOUT", "2"))
+# HTTP/2 согласуется только по TLS (ALPN), для http:// остаётся HTTP/1.1
+USER_SERVICE_HTTP2 = os.getenv("USER_SERVICE_HTTP2", "false").lower() == "true"
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """Создаёт общий клиент, если он ещё не создан."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=USER_SERVICE_MAX_CONNECTIONS,
+                max_keepalive_connections=USER_SERVICE_MAX_KEEPALIVE,
+                keepalive_expiry=USER_SERVICE_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                USER_SERVICE_TIMEOUT, connect=USER_SERVICE_CONNECT_TIMEOUT
+            ),
+            http2=USER_SERVICE_HTTP2,
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Возвращает общий httpx-клиент для запросов к сервису пользователей.
+
+    Клиент создаётся при старте приложения (см. app.main); если приложение
+    запущено без lifespan, он создаётся при первом обращении.
+    """
+    return open_http_client()
@@ -1,6 +1,7 @@
+from contextlib import asynccontextmanager
 from datetime import date, datetime
-from typing import Optional, Dict, Any
-from fastapi import FastAPI, Depends, HTTPException, Request
+from typing import List, Optional, Dict, Any
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr, validator
 from starlette.responses import JSONResponse
@@ -8,9 +9,22 @@ import httpx
 import uuid
 
 # Импортируем роутер постов
-from app import posts
+from app import feed, posts
+from app.http_client import open_http_client, close_http_client, get_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Долгоживущие соединения к сервисам на всё время работы процесса
+    posts.channel_pool.open()
+    open_http_client()
+    yield
+    await close_http_client()
+    await posts.channel_pool.close()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="API Gateway",
     description="Routes requests to backend services",
     version="1.0.0",
@@ -30,7 +44,13 @@ app = FastAPI(
 )
 
 # Импортируем необходимые компоненты из модуля auth
-from app.auth import validate_token, oauth2_scheme, USER_SERVICE_URL
+from app.auth import (
+    token_cache,
+    get_current_user_profile,
+    validate_token,
+    oauth2_scheme,
+    USER_SERVICE_URL,
+)
 
 
 # Request schemas mirroring user service
@@ -51,26 +71,28 @@ class UserRegisterRequest(BaseModel):
 
 
 @app.post("/api/v1/register", tags=["users"])
-async def register(user: UserRegisterRequest):
-    async with httpx.AsyncClient() as client:
-        response = await client.post(f"{USER_SERVICE_URL}/register", json=user.dict())
+async def register(
+    user: UserRegisterRequest, client: httpx.AsyncClient = Depends(get_http_client)
+):
+    response = await client.post(f"{USER_SERVICE_URL}/register", json=user.dict())
     content = response.json()
     content["token_type"] = "Bearer"  # Ensure proper case for Swagger
     return JSONResponse(content=content, status_code=response.status_code)
 
 
 @app.post("/api/v1/token", tags=["users"])
-async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    async with httpx.AsyncClient() as client:
-        print("URL IS\n\n\n\n\n", f"{USER_SERVICE_URL}/token")
-        response = await client.post(
-            f"{USER_SERVICE_URL}/token",
-            data={
-                "username": form_data.username,
-                "password": form_data.password,
-                "grant_type": "password",
-            },
-        )
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    response = await client.post(
+        f"{USER_SERVICE_URL}/token",
+        data={
+            "username": form_data.username,
+            "password": form_data.password,
+            "grant_type": "password",
+        },
+    )
 
     if response.status_code != 200:
         content = response.json()
@@ -83,7 +105,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 
 @app.get("/api/v1/me", tags=["users"])
-async def get_profile(user_data: Dict[str, Any] = Depends(validate_token)):
+async def get_profile(user_data: Dict[str, Any] = Depends(get_current_user_profile)):
     return user_data
 
 
@@ -113,14 +135,15 @@ class UserUpdateRequest(BaseModel):
 
 @app.put("/api/v1/me", tags=["users"])
 async def update_profile(
-    user_update: UserUpdateRequest, token: str = Depends(oauth2_scheme)
+    user_update: UserUpdateRequest,
+    token: str = Depends(oauth2_scheme),
+    client: httpx.AsyncClient = Depends(get_http_client),
 ):
-    async with httpx.AsyncClient() as client:
-        response = await client.put(
-            f"{USER_SERVICE_URL}/me",
-            headers={"Authorization": f"Bearer {token}"},
-            json=user_update.dict(exclude_unset=True),
-        )
+    response = await client.put(
+        f"{USER_SERVICE_URL}/me",
+        headers={"Authorization": f"Bearer {token}"},
+        json=user_update.dict(exclude_unset=True),
+    )
 
     if response.status_code != 200:
         content = response.json()
@@ -132,5 +155,36 @@ async def update_profile(
     return response.json()
 
 
-# Подключаем роутер постов
+@app.get("/api/v1/users", tags=["users"])
+async def get_users(
+    # Идентификаторы через запятую и/или повтором параметра: ?ids=a,b&ids=c
+    ids: List[str] = Query(...),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    try:
+        user_ids = [str(uuid.UUID(i)) for part in ids for i in part.split(",") if i]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be UUIDs")
+
+    response = await client.post(
+        f"{USER_SERVICE_URL}/users/batch", json={"ids": user_ids}
+    )
+
+    if response.status_code != 200:
+        content = response.json()
+        raise HTTPException(
+            status_code=response.status_code,
+            detail=content.get("detail", "Failed to fetch users"),
+        )
+
+    return response.json()
+
+
+@app.get("/internal/metrics/token-cache", include_in_schema=False)
+async def token_cache_metrics():
+    return token_cache.stats()
+
+
+# Подключаем роутеры постов и ленты
 app.include_router(posts.router)
+app.include_router(feed.router)
@@ -1,9 +1,12 @@
+import logging
 import os
 import uuid
 from typing import List, Optional, Dict, Any
 
 import grpc
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 # Импортируем сгенерированный код
@@ -11,9 +14,27 @@ from app.proto import post_service_pb2, post_service_pb2_grpc
 
 # Импортируем функцию валидации токена из модуля auth
 from app.auth import validate_token
+from app.grpc_pool import ChannelPool
 
 # Адрес сервиса постов (лучше брать из переменных окружения)
 POST_SERVICE_URL = os.getenv("POST_SERVICE_URL", "post-service:50051")
+# Настройки пула каналов к сервису постов
+POST_SERVICE_POOL_SIZE = int(os.getenv("POST_SERVICE_POOL_SIZE", "4"))
+POST_SERVICE_KEEPALIVE_MS = int(os.getenv("POST_SERVICE_KEEPALIVE_MS", "30000"))
+POST_SERVICE_KEEPALIVE_TIMEOUT_MS = int(
+    os.getenv("POST_SERVICE_KEEPALIVE_TIMEOUT_MS", "10000")
+)
+POST_SERVICE_MAX_MESSAGE_BYTES = int(
+    os.getenv("POST_SERVICE_MAX_MESSAGE_BYTES", str(16 * 1024 * 1024))
+)
+# Максимум постов в одном запросе /batch (совпадает с лимитом сервиса постов)
+BATCH_GET_POSTS_MAX_IDS = int(os.getenv("BATCH_GET_POSTS_MAX_IDS", "100"))
+# Дедлайн одного вызова сервиса постов, в секундах
+POST_SERVICE_TIMEOUT = float(os.getenv("POST_SERVICE_TIMEOUT", "5"))
+# Дедлайн всей выгрузки постов пользователя (/export), в секундах
+POST_SERVICE_EXPORT_TIMEOUT = float(os.getenv("POST_SERVICE_EXPORT_TIMEOUT", "600"))
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/posts", tags=["posts"])
 
@@ -36,30 +57,100 @@ class PostResponse(BaseModel):
     content: str
     created_at: str
     updated_at: str
+    # Все реакции к посту; обновляется с задержкой в несколько секунд
+    like_count: int = 0
+
+
+class ReactionCreate(BaseModel):
+    reaction_type: str = Field("like", min_length=1, max_length=20)
+
+
+class ReactionResult(BaseModel):
+    changed: bool
+    like_count: int
+
+
+class ReactionItem(BaseModel):
+    user_id: uuid.UUID
+    reaction_type: str
+    created_at: str
+
+
+class ListReactionsResponse(BaseModel):
+    reactions: List[ReactionItem]
+    next_cursor: Optional[str] = None
+
+
+def post_json(post: post_service_pb2.Post) -> Dict[str, Any]:
+    """
+    Пост в виде словаря для PostJSONResponse, по схеме PostResponse.
+
+    UUID и datetime orjson сам превращает в те же строки, что и pydantic,
+    поэтому промежуточные строки и модели не создаются.
+    """
+    return {
+        "id": uuid.UUID(bytes=post.id),
+        "user_id": uuid.UUID(bytes=post.user_id),
+        "title": post.title,
+        "content": post.content,
+        "created_at": post.created_at.ToDatetime(),
+        "updated_at": post.updated_at.ToDatetime(),
+        "like_count": post.like_count,
+    }
+
+
+class PostJSONResponse(Response):
+    """
+    JSON-ответ через orjson без повторной проверки по response_model.
+
+    Модель в response_model остаётся только для схемы OpenAPI: FastAPI не
+    валидирует ответ, если обработчик сам вернул Response.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
 
 
 class ListPostsResponse(BaseModel):
     posts: List[PostResponse]
     total: int
+    next_cursor: Optional[str] = None
+
+
+class BatchPostsResponse(BaseModel):
+    posts: List[PostResponse]
+    missing_ids: List[str]
+
+
+# --- Пул асинхронных gRPC-каналов к сервису постов ---
+# Открывается при старте приложения и закрывается при остановке (см. app.main)
+channel_pool = ChannelPool(
+    POST_SERVICE_URL,
+    size=POST_SERVICE_POOL_SIZE,
+    options=[
+        # Отдельный пул сабканалов, иначе все каналы делят одно TCP-соединение
+        ("grpc.use_local_subchannel_pool", 1),
+        ("grpc.keepalive_time_ms", POST_SERVICE_KEEPALIVE_MS),
+        ("grpc.keepalive_timeout_ms", POST_SERVICE_KEEPALIVE_TIMEOUT_MS),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        ("grpc.max_send_message_length", POST_SERVICE_MAX_MESSAGE_BYTES),
+        ("grpc.max_receive_message_length", POST_SERVICE_MAX_MESSAGE_BYTES),
+    ],
+)
 
 
 # --- Функция для получения gRPC стаба ---
-def get_post_service_stub():
-    # TODO: Рассмотреть возможность переиспользования канала (channel)
-    # для повышения производительности, например, с помощью Depends или middleware.
+async def get_post_service_stub() -> post_service_pb2_grpc.PostServiceStub:
     try:
-        channel = grpc.insecure_channel(POST_SERVICE_URL)
-        stub = post_service_pb2_grpc.PostServiceStub(channel)
-        yield stub
-    except grpc.RpcError as e:
-        # Логирование ошибки может быть полезно здесь
+        return await channel_pool.get_stub()
+    except RuntimeError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Post service connection error: {e.details()}",
+            detail=f"Post service connection error: {e}",
         )
-    finally:
-        if "channel" in locals() and channel:
-            channel.close()
 
 
 # --- Обработчики ошибок gRPC ---
@@ -72,6 +163,16 @@ def handle_grpc_error(e: grpc.RpcError):
         e.code() == grpc.StatusCode.PERMISSION_DENIED
     ):  # Или UNAUTHENTICATED в зависимости от логики сервиса
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=e.details())
+    elif e.code() == grpc.StatusCode.DEADLINE_EXCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Post service did not respond in time",
+        )
+    elif e.code() == grpc.StatusCode.UNAVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Post service unavailable: {e.details()}",
+        )
     else:
         # Общая ошибка сервера для других gRPC ошибок
         raise HTTPException(
@@ -97,19 +198,78 @@ async def create_post(
         user_id=str(user_id), title=post_data.title, content=post_data.content
     )
     try:
-        response = stub.CreatePost(request)
-        return PostResponse(
-            id=uuid.UUID(response.id),
-            user_id=uuid.UUID(response.user_id),
-            title=response.title,
-            content=response.content,
-            created_at=response.created_at,
-            updated_at=response.updated_at,
+        response = await stub.CreatePost(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            post_json(response), status_code=status.HTTP_201_CREATED
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+
+@router.get("/batch", response_model=BatchPostsResponse)
+async def batch_get_posts(
+    # Идентификаторы через запятую и/или повтором параметра: ?ids=a,b&ids=c
+    ids: List[str] = Query(...),
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    post_ids = [i for part in ids for i in part.split(",") if i]
+    if len(post_ids) > BATCH_GET_POSTS_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {BATCH_GET_POSTS_MAX_IDS} ids per request",
+        )
+
+    request = post_service_pb2.BatchGetPostsRequest(post_ids=post_ids)
+    try:
+        response = await stub.BatchGetPosts(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {
+                "posts": [post_json(p) for p in response.posts],
+                "missing_ids": list(response.missing_ids),
+            }
         )
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
 
+@router.get("/export")
+async def export_posts(
+    user_id: uuid.UUID,
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    """
+    Выгружает все посты пользователя в формате NDJSON (один пост на строку).
+
+    Посты читаются из потока ExportUserPosts и сразу отправляются клиенту,
+    поэтому память не растёт с количеством постов.
+    """
+    request = post_service_pb2.ExportUserPostsRequest(user_id=str(user_id))
+    call = stub.ExportUserPosts(request, timeout=POST_SERVICE_EXPORT_TIMEOUT)
+    try:
+        # Первое сообщение читаем до начала ответа, чтобы ошибки сервиса
+        # постов (недоступен, таймаут) превратились в обычный HTTP-статус
+        first = await call.read()
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+    async def lines():
+        try:
+            post = first
+            while post is not grpc.aio.EOF:
+                yield orjson.dumps(post_json(post)) + b"\n"
+                post = await call.read()
+        except grpc.RpcError as e:
+            # Статус уже отправлен; обрываем ответ, чтобы клиент не принял
+            # неполную выгрузку за полную
+            logger.error(f"Export for user {user_id} failed: {e.details()}")
+            raise
+        finally:
+            # Клиент отключился раньше времени - останавливаем поток на сервисе
+            call.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
     post_id: uuid.UUID,
@@ -118,15 +278,8 @@ async def get_post(
 ):
     request = post_service_pb2.GetPostRequest(post_id=str(post_id))
     try:
-        response = stub.GetPost(request)
-        return PostResponse(
-            id=uuid.UUID(response.id),
-            user_id=uuid.UUID(response.user_id),
-            title=response.title,
-            content=response.content,
-            created_at=response.created_at,
-            updated_at=response.updated_at,
-        )
+        response = await stub.GetPost(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(post_json(response))
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
@@ -136,26 +289,23 @@ async def list_posts(
     user_id: uuid.UUID,  # Фильтрация по user_id обязательна
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    # Курсор из next_cursor предыдущего ответа; если задан, page игнорируется
+    cursor: Optional[str] = Query(None),
     stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
     # Авторизация не требуется для просмотра постов пользователя по ТЗ
 ):
     request = post_service_pb2.ListPostsRequest(
-        user_id=str(user_id), page=page, page_size=page_size
+        user_id=str(user_id), page=page, page_size=page_size, cursor=cursor or ""
     )
     try:
-        response = stub.ListPosts(request)
-        posts_list = [
-            PostResponse(
-                id=uuid.UUID(p.id),
-                user_id=uuid.UUID(p.user_id),
-                title=p.title,
-                content=p.content,
-                created_at=p.created_at,
-                updated_at=p.updated_at,
-            )
-            for p in response.posts
-        ]
-        return ListPostsResponse(posts=posts_list, total=response.total)
+        response = await stub.ListPosts(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {
+                "posts": [post_json(p) for p in response.posts],
+                "total": response.total,
+                "next_cursor": response.next_cursor or None,
+            }
+        )
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
@@ -167,29 +317,25 @@ async def update_post(
     user_data: Dict[str, Any] = Depends(validate_token),
     stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
 ):
-    # Проверяем, что пользователь обновляет свой пост (хотя сервис постов должен это делать сам)
-    # user_id = user_data.get("id")
-    # if not user_id:
-    #     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data")
-    # TODO: Возможно, стоит добавить проверку в гейтвее, что user_id из токена совпадает с user_id поста перед отправкой запроса
+    # Сервис постов сам проверяет, что пост принадлежит пользователю из токена
+    user_id = user_data.get("id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data"
+        )
 
-    update_data = post_data.dict(exclude_unset=True)
+    update_data = post_data.dict(exclude_unset=True, exclude_none=True)
     if not update_data:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update"
         )
 
-    request = post_service_pb2.UpdatePostRequest(post_id=str(post_id), **update_data)
+    request = post_service_pb2.UpdatePostRequest(
+        post_id=str(post_id), user_id=str(user_id), **update_data
+    )
     try:
-        response = stub.UpdatePost(request)
-        return PostResponse(
-            id=uuid.UUID(response.id),
-            user_id=uuid.UUID(response.user_id),
-            title=response.title,
-            content=response.content,
-            created_at=response.created_at,
-            updated_at=response.updated_at,
-        )
+        response = await stub.UpdatePost(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(post_json(response))
     except grpc.RpcError as e:
         handle_grpc_error(e)
 
@@ -210,7 +356,7 @@ async def delete_post(
         post_id=str(post_id), user_id=str(user_id)
     )
     try:
-        response = stub.DeletePost(request)
+        response = await stub.DeletePost(request, timeout=POST_SERVICE_TIMEOUT)
         if not response.success:
             # Эта ситуация не должна возникать, если handle_grpc_error работает правильно,
             # но добавим для надежности.
@@ -223,3 +369,86 @@ async def delete_post(
     except grpc.RpcError as e:
         # NOT_FOUND или PERMISSION_DENIED должны быть обработаны здесь
         handle_grpc_error(e)
+
+
+# --- Реакции ---
+@router.put("/{post_id}/reaction", response_model=ReactionResult)
+async def react_to_post(
+    post_id: uuid.UUID,
+    reaction: ReactionCreate,
+    user_data: Dict[str, Any] = Depends(validate_token),
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    """
+    Ставит реакцию пользователя из токена (по одной на пост).
+
+    Повторный запрос с тем же типом ничего не меняет, с другим типом
+    заменяет реакцию, не увеличивая счётчик.
+    """
+    user_id = user_data.get("id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data"
+        )
+
+    request = post_service_pb2.ReactRequest(
+        post_id=str(post_id), user_id=str(user_id), reaction_type=reaction.reaction_type
+    )
+    try:
+        response = await stub.React(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {"changed": response.changed, "like_count": response.like_count}
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+
+@router.delete("/{post_id}/reaction", response_model=ReactionResult)
+async def remove_reaction(
+    post_id: uuid.UUID,
+    user_data: Dict[str, Any] = Depends(validate_token),
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    user_id = user_data.get("id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token data"
+        )
+
+    request = post_service_pb2.UnreactRequest(post_id=str(post_id), user_id=str(user_id))
+    try:
+        response = await stub.Unreact(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {"changed": response.changed, "like_count": response.like_count}
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
+
+
+@router.get("/{post_id}/reactions", response_model=ListReactionsResponse)
+async def list_reactions(
+    post_id: uuid.UUID,
+    page_size: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    stub: post_service_pb2_grpc.PostServiceStub = Depends(get_post_service_stub),
+):
+    request = post_service_pb2.ListReactionsRequest(
+        post_id=str(post_id), page_size=page_size, cursor=cursor or ""
+    )
+    try:
+        response = await stub.ListReactions(request, timeout=POST_SERVICE_TIMEOUT)
+        return PostJSONResponse(
+            {
+                "reactions": [
+                    {
+                        "user_id": uuid.UUID(bytes=r.user_id),
+                        "reaction_type": r.reaction_type,
+                        "created_at": r.created_at.ToDatetime(),
+                    }
+                    for r in response.reactions
+                ],
+                "next_cursor": response.next_cursor or None,
+            }
+        )
+    except grpc.RpcError as e:
+        handle_grpc_error(e)
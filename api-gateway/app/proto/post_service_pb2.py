@@ -19,8 +19,10 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import timestamp_pb2 as google_dot_protobuf_dot_timestamp__pb2
+
 DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(
-    b'\n\x12post_service.proto\x12\x04post"D\n\x11\x43reatePostRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t"!\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t"D\n\x10ListPostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x11\n\tpage_size\x18\x03 \x01(\x05"=\n\x11ListPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\r\n\x05total\x18\x02 \x01(\x05"D\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"k\n\x04Post\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\r\n\x05title\x18\x03 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x04 \x01(\t\x12\x12\n\ncreated_at\x18\x05 \x01(\t\x12\x12\n\nupdated_at\x18\x06 \x01(\t2\x9f\x02\n\x0bPostService\x12\x31\n\nCreatePost\x12\x17.post.CreatePostRequest\x1a\n.post.Post\x12+\n\x07GetPost\x12\x14.post.GetPostRequest\x1a\n.post.Post\x12<\n\tListPosts\x12\x16.post.ListPostsRequest\x1a\x17.post.ListPostsResponse\x12\x31\n\nUpdatePost\x12\x17.post.UpdatePostRequest\x1a\n.post.Post\x12?\n\nDeletePost\x12\x17.post.DeletePostRequest\x1a\x18.post.DeletePostResponseb\x06proto3'
+    b'\n\x12post_service.proto\x12\x04post\x1a\x1fgoogle/protobuf/timestamp.proto"D\n\x11\x43reatePostRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t"E\n\x14\x42ulkCreatePostResult\x12\r\n\x05index\x18\x01 \x01(\x05\x12\x0f\n\x07post_id\x18\x02 \x01(\t\x12\r\n\x05\x65rror\x18\x03 \x01(\t"g\n\x17\x42ulkCreatePostsResponse\x12+\n\x07results\x18\x01 \x03(\x0b\x32\x1a.post.BulkCreatePostResult\x12\x0f\n\x07\x63reated\x18\x02 \x01(\x05\x12\x0e\n\x06\x66\x61iled\x18\x03 \x01(\x05"!\n\x0eGetPostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t"(\n\x14\x42\x61tchGetPostsRequest\x12\x10\n\x08post_ids\x18\x01 \x03(\t"G\n\x15\x42\x61tchGetPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\x13\n\x0bmissing_ids\x18\x02 \x03(\t"T\n\x10ListPostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x0c\n\x04page\x18\x02 \x01(\x05\x12\x11\n\tpage_size\x18\x03 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t"R\n\x11ListPostsResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x13\n\x0bnext_cursor\x18\x03 \x01(\t"=\n\x16\x45xportUserPostsRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x12\n\nfetch_size\x18\x02 \x01(\x05"u\n\x11UpdatePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x12\n\x05title\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x14\n\x07\x63ontent\x18\x03 \x01(\tH\x01\x88\x01\x01\x12\x0f\n\x07user_id\x18\x04 \x01(\tB\x08\n\x06_titleB\n\n\x08_content"5\n\x11\x44\x65letePostRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t"%\n\x12\x44\x65letePostResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08"D\n\x0eGetFeedRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\t\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t"A\n\x0fGetFeedResponse\x12\x19\n\x05posts\x18\x01 \x03(\x0b\x32\n.post.Post\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t"G\n\x0cReactRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t\x12\x15\n\rreaction_type\x18\x03 \x01(\t"2\n\x0eUnreactRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\t"7\n\x10ReactionResponse\x12\x0f\n\x07\x63hanged\x18\x01 \x01(\x08\x12\x12\n\nlike_count\x18\x02 \x01(\x03"J\n\x14ListReactionsRequest\x12\x0f\n\x07post_id\x18\x01 \x01(\t\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x03 \x01(\t"b\n\x08Reaction\x12\x0f\n\x07user_id\x18\x01 \x01(\x0c\x12\x15\n\rreaction_type\x18\x02 \x01(\t\x12.\n\ncreated_at\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.Timestamp"O\n\x15ListReactionsResponse\x12!\n\treactions\x18\x01 \x03(\x0b\x32\x0e.post.Reaction\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t"\xcf\x01\n\x04Post\x12\n\n\x02id\x18\x07 \x01(\x0c\x12\x0f\n\x07user_id\x18\x08 \x01(\x0c\x12\r\n\x05title\x18\x03 \x01(\t\x12\x0f\n\x07\x63ontent\x18\x04 \x01(\t\x12.\n\ncreated_at\x18\t \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12.\n\nupdated_at\x18\n \x01(\x0b\x32\x1a.google.protobuf.Timestamp\x12\x12\n\nlike_count\x18\x0b \x01(\x03J\x04\x08\x01\x10\x02J\x04\x08\x02\x10\x03J\x04\x08\x05\x10\x06J\x04\x08\x06\x10\x07\x32\xe5\x05\n\x0bPostService\x12\x31\n\nCreatePost\x12\x17.post.CreatePostRequest\x1a\n.post.Post\x12K\n\x0f\x42ulkCreatePosts\x12\x17.post.CreatePostRequest\x1a\x1d.post.BulkCreatePostsResponse(\x01\x12+\n\x07GetPost\x12\x14.post.GetPostRequest\x1a\n.post.Post\x12H\n\rBatchGetPosts\x12\x1a.post.BatchGetPostsRequest\x1a\x1b.post.BatchGetPostsResponse\x12<\n\tListPosts\x12\x16.post.ListPostsRequest\x1a\x17.post.ListPostsResponse\x12=\n\x0f\x45xportUserPosts\x12\x1c.post.ExportUserPostsRequest\x1a\n.post.Post0\x01\x12\x31\n\nUpdatePost\x12\x17.post.UpdatePostRequest\x1a\n.post.Post\x12?\n\nDeletePost\x12\x17.post.DeletePostRequest\x1a\x18.post.DeletePostResponse\x12\x36\n\x07GetFeed\x12\x14.post.GetFeedRequest\x1a\x15.post.GetFeedResponse\x12\x33\n\x05React\x12\x12.post.ReactRequest\x1a\x16.post.ReactionResponse\x12\x37\n\x07Unreact\x12\x14.post.UnreactRequest\x1a\x16.post.ReactionResponse\x12H\n\rListReactions\x12\x1a.post.ListReactionsRequest\x1a\x1b.post.ListReactionsResponseb\x06proto3'
 )
 
 _globals = globals()
@@ -28,22 +30,48 @@ _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, "post_service_pb2", _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
     DESCRIPTOR._loaded_options = None
-    _globals["_CREATEPOSTREQUEST"]._serialized_start = 28
-    _globals["_CREATEPOSTREQUEST"]._serialized_end = 96
-    _globals["_GETPOSTREQUEST"]._serialized_start = 98
-    _globals["_GETPOSTREQUEST"]._serialized_end = 131
-    _globals["_LISTPOSTSREQUEST"]._serialized_start = 133
-    _globals["_LISTPOSTSREQUEST"]._serialized_end = 201
-    _globals["_LISTPOSTSRESPONSE"]._serialized_start = 203
-    _globals["_LISTPOSTSRESPONSE"]._serialized_end = 264
-    _globals["_UPDATEPOSTREQUEST"]._serialized_start = 266
-    _globals["_UPDATEPOSTREQUEST"]._serialized_end = 334
-    _globals["_DELETEPOSTREQUEST"]._serialized_start = 336
-    _globals["_DELETEPOSTREQUEST"]._serialized_end = 389
-    _globals["_DELETEPOSTRESPONSE"]._serialized_start = 391
-    _globals["_DELETEPOSTRESPONSE"]._serialized_end = 428
-    _globals["_POST"]._serialized_start = 430
-    _globals["_POST"]._serialized_end = 537
-    _globals["_POSTSERVICE"]._serialized_start = 540
-    _globals["_POSTSERVICE"]._serialized_end = 827
+    _globals["_CREATEPOSTREQUEST"]._serialized_start = 61
+    _globals["_CREATEPOSTREQUEST"]._serialized_end = 129
+    _globals["_BULKCREATEPOSTRESULT"]._serialized_start = 131
+    _globals["_BULKCREATEPOSTRESULT"]._serialized_end = 200
+    _globals["_BULKCREATEPOSTSRESPONSE"]._serialized_start = 202
+    _globals["_BULKCREATEPOSTSRESPONSE"]._serialized_end = 305
+    _globals["_GETPOSTREQUEST"]._serialized_start = 307
+    _globals["_GETPOSTREQUEST"]._serialized_end = 340
+    _globals["_BATCHGETPOSTSREQUEST"]._serialized_start = 342
+    _globals["_BATCHGETPOSTSREQUEST"]._serialized_end = 382
+    _globals["_BATCHGETPOSTSRESPONSE"]._serialized_start = 384
+    _globals["_BATCHGETPOSTSRESPONSE"]._serialized_end = 455
+    _globals["_LISTPOSTSREQUEST"]._serialized_start = 457
+    _globals["_LISTPOSTSREQUEST"]._serialized_end = 541
+    _globals["_LISTPOSTSRESPONSE"]._serialized_start = 543
+    _globals["_LISTPOSTSRESPONSE"]._serialized_end = 625
+    _globals["_EXPORTUSERPOSTSREQUEST"]._serialized_start = 627
+    _globals["_EXPORTUSERPOSTSREQUEST"]._serialized_end = 688
+    _globals["_UPDATEPOSTREQUEST"]._serialized_start = 690
+    _globals["_UPDATEPOSTREQUEST"]._serialized_end = 807
+    _globals["_DELETEPOSTREQUEST"]._serialized_start = 809
+    _globals["_DELETEPOSTREQUEST"]._serialized_end = 862
+    _globals["_DELETEPOSTRESPONSE"]._serialized_start = 864
+    _globals["_DELETEPOSTRESPONSE"]._serialized_end = 901
+    _globals["_GETFEEDREQUEST"]._serialized_start = 903
+    _globals["_GETFEEDREQUEST"]._serialized_end = 971
+    _globals["_GETFEEDRESPONSE"]._serialized_start = 973
+    _globals["_GETFEEDRESPONSE"]._serialized_end = 1038
+    _globals["_REACTREQUEST"]._serialized_start = 1040
+    _globals["_REACTREQUEST"]._serialized_end = 1111
+    _globals["_UNREACTREQUEST"]._serialized_start = 1113
+    _globals["_UNREACTREQUEST"]._serialized_end = 1163
+    _globals["_REACTIONRESPONSE"]._serialized_start = 1165
+    _globals["_REACTIONRESPONSE"]._serialized_end = 1220
+    _globals["_LISTREACTIONSREQUEST"]._serialized_start = 1222
+    _globals["_LISTREACTIONSREQUEST"]._serialized_end = 1296
+    _globals["_REACTION"]._serialized_start = 1298
+    _globals["_REACTION"]._serialized_end = 1396
+    _globals["_LISTREACTIONSRESPONSE"]._serialized_start = 1398
+    _globals["_LISTREACTIONSRESPONSE"]._serialized_end = 1477
+    _globals["_POST"]._serialized_start = 1480
+    _globals["_POST"]._serialized_end = 1687
+    _globals["_POSTSERVICE"]._serialized_start = 1690
+    _globals["_POSTSERVICE"]._serialized_end = 2431
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from jose import JWTError, jwt
+
+
+class TokenCache:
+    """
+    LRU-кеш результатов проверки токенов с ограниченным временем жизни.
+
+    Ключ - SHA-256 от токена, чтобы не держать сами токены в памяти (для
+    версий токенов это SHA-256 от user_id).
+    Запись живёт не дольше ttl секунд и не дольше срока действия токена
+    (claim exp). Одновременные запросы с одним и тем же токеном ждут
+    одного обращения к fetch (single-flight), даже если первый из них
+    отменён. Ошибки не кешируются.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_fetch(
+        self,
+        token: str,
+        fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        key = hashlib.sha256(token.encode()).hexdigest()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # Отдельная задача, а не корутина первого запроса: если его
+            # клиент отключится, остальные всё равно дождутся результата
+            task = asyncio.create_task(self._fetch_and_store(key, token, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        token: str,
+        fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        value = await fetch(token)
+        self._store(key, value, self._ttl_for(token))
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def _ttl_for(self, token: str) -> float:
+        try:
+            exp = jwt.get_unverified_claims(token).get("exp")
+        except JWTError:
+            exp = None
+        if exp is None:
+            return self.ttl
+        return min(self.ttl, exp - time.time())
+
+    def _store(self, key: str, value: Dict[str, Any], ttl: float):
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
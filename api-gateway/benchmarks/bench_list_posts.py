@@ -0,0 +1,126 @@
+"""List posts serialization benchmark.
+
+Reports requests/sec for GET /api/v1/posts/ with a full page of posts,
+served the way the gateway used to (PostResponse models validated again
+through response_model) and through the orjson path it uses now. The post
+service is replaced by a stub that answers instantly, so the difference is
+the gateway's own cost of turning a ListPostsResponse into JSON.
+
+    python -m benchmarks.bench_list_posts --seconds 5 --page-size 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from fastapi import Depends, FastAPI
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.posts import ListPostsResponse, PostResponse, get_post_service_stub, router
+from app.proto import post_service_pb2
+
+
+class FakeStub:
+    def __init__(self, page_size: int):
+        self.response = post_service_pb2.ListPostsResponse(
+            posts=[make_post(i) for i in range(page_size)], total=page_size
+        )
+
+    async def ListPosts(self, request, timeout=None):
+        return self.response
+
+
+def make_post(i: int) -> post_service_pb2.Post:
+    post = post_service_pb2.Post(
+        id=uuid.uuid4().bytes,
+        user_id=uuid.uuid4().bytes,
+        title=f"Post {i}",
+        content="benchmark content " * 20,
+    )
+    post.created_at.FromDatetime(datetime.utcnow())
+    post.updated_at.FromDatetime(datetime.utcnow())
+    return post
+
+
+def legacy_post_response(post: post_service_pb2.Post) -> PostResponse:
+    return PostResponse(
+        id=uuid.UUID(bytes=post.id),
+        user_id=uuid.UUID(bytes=post.user_id),
+        title=post.title,
+        content=post.content,
+        created_at=post.created_at.ToDatetime().isoformat(),
+        updated_at=post.updated_at.ToDatetime().isoformat(),
+    )
+
+
+def make_app(stub: FakeStub) -> FastAPI:
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_post_service_stub] = lambda: stub
+
+    @app.get("/legacy/posts/", response_model=ListPostsResponse)
+    async def legacy_list_posts(
+        user_id: uuid.UUID, page_size: int = 10, stub=Depends(get_post_service_stub)
+    ):
+        response = await stub.ListPosts(None)
+        return ListPostsResponse(
+            posts=[legacy_post_response(p) for p in response.posts],
+            total=response.total,
+            next_cursor=response.next_cursor or None,
+        )
+
+    return app
+
+
+async def requests_per_second(client: httpx.AsyncClient, url: str, params, seconds):
+    done = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        response = await client.get(url, params=params)
+        response.raise_for_status()
+        done += 1
+    return done / (time.perf_counter() - started)
+
+
+async def run(args):
+    app = make_app(FakeStub(args.page_size))
+    params = {"user_id": str(uuid.uuid4()), "page_size": args.page_size}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = [
+            (
+                "pydantic",
+                await requests_per_second(
+                    client, "/legacy/posts/", params, args.seconds
+                ),
+            ),
+            (
+                "orjson",
+                await requests_per_second(
+                    client, "/api/v1/posts/", params, args.seconds
+                ),
+            ),
+        ]
+
+    print(f"{'path':<12} {'requests/sec':>14}")
+    for label, rate in results:
+        print(f"{label:<12} {rate:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app import auth
+
+SECRET = "test-secret"
+USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+def make_token(expires_in=timedelta(minutes=5), key=SECRET, **claims):
+    claims.setdefault("sub", "testuser")
+    claims["exp"] = datetime.utcnow() + expires_in
+    return jwt.encode(claims, key, algorithm="HS256")
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth.token_cache.clear()
+    auth.token_version_cache.clear()
+    yield
+    auth.token_cache.clear()
+    auth.token_version_cache.clear()
+
+
+@pytest.fixture
+def local_auth(monkeypatch):
+    monkeypatch.setattr(auth, "JWT_SECRET_KEY", SECRET)
+
+    async def remote_not_expected(token):
+        raise AssertionError("user service must not be called")
+
+    monkeypatch.setattr(auth, "fetch_current_user", remote_not_expected)
+    versions = {USER_ID: 0}
+    fetched = []
+
+    async def fetch_token_version(user_id):
+        fetched.append(user_id)
+        return {"token_version": versions[user_id]}
+
+    monkeypatch.setattr(auth, "fetch_token_version", fetch_token_version)
+    return versions, fetched
+
+
+def test_validate_token_locally(local_auth):
+    """A signed token with user_id is accepted without calling /me"""
+    user_data = asyncio.run(auth.validate_token(make_token(user_id=USER_ID)))
+
+    assert user_data == {"id": USER_ID, "login": "testuser"}
+
+
+def test_validate_token_locally_rejects_revoked(local_auth):
+    """Tokens older than the user's token version are rejected"""
+    versions, fetched = local_auth
+    token = make_token(user_id=USER_ID, tv=0)
+
+    async def validate_twice():
+        await auth.validate_token(token)
+        await auth.validate_token(make_token(user_id=USER_ID))
+
+    # The version is fetched once per user and then cached
+    asyncio.run(validate_twice())
+    assert fetched == [USER_ID]
+
+    versions[USER_ID] = 1
+    auth.token_version_cache.clear()
+    for stale in (token, make_token(user_id=USER_ID)):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(auth.validate_token(stale))
+        assert exc.value.status_code == 401
+    user_data = asyncio.run(auth.validate_token(make_token(user_id=USER_ID, tv=1)))
+    assert user_data["id"] == USER_ID
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        make_token(expires_in=timedelta(minutes=-1), user_id=USER_ID),
+        make_token(key="other-secret", user_id=USER_ID),
+        "not-a-jwt",
+    ],
+)
+def test_validate_token_locally_rejects(local_auth, token):
+    """Expired, forged and malformed tokens are rejected locally"""
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth.validate_token(token))
+    assert exc.value.status_code == 401
+
+
+def test_validate_token_falls_back_to_user_service(monkeypatch):
+    """Tokens without user_id are validated by the user service"""
+    monkeypatch.setattr(auth, "JWT_SECRET_KEY", SECRET)
+    calls = []
+
+    async def fetch_current_user(token):
+        calls.append(token)
+        return {"id": USER_ID, "login": "testuser", "email": "test@example.com"}
+
+    monkeypatch.setattr(auth, "fetch_current_user", fetch_current_user)
+    token = make_token()
+
+    user_data = asyncio.run(auth.validate_token(token))
+
+    assert calls == [token]
+    assert user_data["id"] == USER_ID
+
+    monkeypatch.setattr(auth, "AUTH_REMOTE_FALLBACK", False)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(auth.validate_token(token))
+    assert exc.value.status_code == 401
@@ -0,0 +1,81 @@
+import asyncio
+
+import grpc
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.grpc_pool import ChannelPool
+
+
+class FakeChannelPool(ChannelPool):
+    """Pool that hands out mock aio channels with a settable state"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__("post-service:50051", *args, **kwargs)
+        self.created = []
+
+    def _create_channel(self):
+        channel = MagicMock()
+        channel.get_state.return_value = grpc.ChannelConnectivity.IDLE
+        channel.close = AsyncMock()
+        self.created.append(channel)
+        return channel
+
+    def set_state(self, index, state):
+        self._channels[index].get_state.return_value = state
+
+
+def test_pool_round_robin():
+    """Stubs are handed out round-robin over all channels"""
+    pool = FakeChannelPool(size=3)
+    pool.open()
+
+    stubs = [asyncio.run(pool.get_stub()) for _ in range(6)]
+
+    assert len(pool.created) == 3
+    assert stubs[:3] == stubs[3:]
+    assert len({id(s) for s in stubs}) == 3
+
+
+def test_pool_skips_failed_channels():
+    """Channels in TRANSIENT_FAILURE are skipped while others are healthy"""
+    pool = FakeChannelPool(size=2)
+    pool.open()
+    pool.set_state(0, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    pool.set_state(1, grpc.ChannelConnectivity.READY)
+
+    healthy_stub = pool._stubs[1]
+    assert all(asyncio.run(pool.get_stub()) is healthy_stub for _ in range(4))
+
+
+def test_pool_reconnects_when_all_channels_failed():
+    """A fully failed pool recreates a channel, but not more often than allowed"""
+    pool = FakeChannelPool(size=2, reconnect_interval=0)
+    pool.open()
+    pool.set_state(0, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    pool.set_state(1, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    old_channels = list(pool._channels)
+
+    asyncio.run(pool.get_stub())
+
+    assert len(pool.created) == 3
+    assert sum(old.close.await_count for old in old_channels) == 1
+
+    pool.reconnect_interval = 60
+    pool.set_state(0, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    pool.set_state(1, grpc.ChannelConnectivity.TRANSIENT_FAILURE)
+    asyncio.run(pool.get_stub())
+    assert len(pool.created) == 3
+
+
+def test_pool_close():
+    """Closing the pool closes every channel and refuses new stubs"""
+    pool = FakeChannelPool(size=2)
+    pool.open()
+    channels = list(pool.created)
+
+    asyncio.run(pool.close())
+
+    assert all(channel.close.await_count == 1 for channel in channels)
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.get_stub())
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app import http_client
+from app.main import app
+from app.http_client import get_http_client
+
+
+def test_http_client_is_shared():
+    """The same pooled client is returned until it is closed"""
+    first = http_client.open_http_client()
+    assert http_client.get_http_client() is first
+
+    asyncio.run(http_client.close_http_client())
+    assert first.is_closed
+    assert http_client.get_http_client() is not first
+
+
+def test_http_client_follows_app_lifespan():
+    """The client is opened on startup and closed on shutdown"""
+    asyncio.run(http_client.close_http_client())
+
+    with TestClient(app):
+        client = http_client._client
+        assert client is not None and not client.is_closed
+
+    assert client.is_closed
+    assert http_client._client is None
+
+
+def test_proxy_calls_reuse_injected_client():
+    """Proxy handlers use the shared client instead of creating their own"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"access_token": "token", "token_type": "bearer"})
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.dependency_overrides[get_http_client] = lambda: shared
+    try:
+        client = TestClient(app)
+        for _ in range(2):
+            response = client.post(
+                "/api/v1/token", data={"username": "user", "password": "password123"}
+            )
+            assert response.status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_http_client, None)
+
+    assert [r.url.path for r in requests] == ["/token", "/token"]
+
+
+def test_get_users_batch_forwards_ids():
+    """GET /api/v1/users resolves all ids with one user service call"""
+    requests = []
+    ids = [
+        "123e4567-e89b-12d3-a456-426614174000",
+        "123e4567-e89b-12d3-a456-426614174001",
+        "123e4567-e89b-12d3-a456-426614174002",
+    ]
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"users": [{"id": i, "login": i} for i in ids]})
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    app.dependency_overrides[get_http_client] = lambda: shared
+    try:
+        response = TestClient(app).get(
+            "/api/v1/users", params=[("ids", ",".join(ids[:2])), ("ids", ids[2])]
+        )
+        bad_response = TestClient(app).get("/api/v1/users", params={"ids": "nope"})
+    finally:
+        app.dependency_overrides.pop(get_http_client, None)
+
+    assert response.status_code == 200
+    assert len(response.json()["users"]) == 3
+    assert len(requests) == 1
+    assert requests[0].url.path == "/users/batch"
+    assert json.loads(requests[0].content) == {"ids": ids}
+    assert bad_response.status_code == 422
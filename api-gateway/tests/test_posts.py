@@ -0,0 +1,253 @@
+import json
+import uuid
+from datetime import datetime
+
+import grpc
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.auth import validate_token
+from app.main import app
+from app.posts import get_post_service_stub, POST_SERVICE_TIMEOUT
+from app.proto import post_service_pb2
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+def make_post(**overrides):
+    fields = dict(
+        id=uuid.uuid4().bytes,
+        user_id=uuid.UUID(USER_ID).bytes,
+        title="Title",
+        content="Content",
+    )
+    fields.update(overrides)
+    post = post_service_pb2.Post(**fields)
+    post.created_at.FromDatetime(datetime(2023, 1, 1))
+    post.updated_at.FromDatetime(datetime(2023, 1, 1))
+    return post
+
+
+def post_id(post):
+    return str(uuid.UUID(bytes=post.id))
+
+
+@pytest.fixture
+def stub():
+    stub = MagicMock()
+    app.dependency_overrides[get_post_service_stub] = lambda: stub
+    yield stub
+    app.dependency_overrides.pop(get_post_service_stub, None)
+
+
+def test_list_posts_awaits_stub_with_deadline(client, stub):
+    """List posts goes through the async stub with a per-call deadline"""
+    post = make_post()
+    stub.ListPosts = AsyncMock(
+        return_value=post_service_pb2.ListPostsResponse(
+            posts=[post], total=1, next_cursor="abc"
+        )
+    )
+
+    response = client.get("/api/v1/posts/", params={"user_id": USER_ID})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["next_cursor"] == "abc"
+    assert data["posts"][0]["created_at"] == "2023-01-01T00:00:00"
+    assert data["posts"][0]["id"] == post_id(post)
+    request = stub.ListPosts.await_args.args[0]
+    assert request.user_id == USER_ID
+    assert stub.ListPosts.await_args.kwargs["timeout"] == POST_SERVICE_TIMEOUT
+
+
+def test_get_post_deadline_exceeded(client, stub):
+    """A post service deadline is reported as a gateway timeout"""
+    stub.GetPost = AsyncMock(
+        side_effect=grpc.aio.AioRpcError(
+            grpc.StatusCode.DEADLINE_EXCEEDED,
+            grpc.aio.Metadata(),
+            grpc.aio.Metadata(),
+            details="Deadline Exceeded",
+        )
+    )
+
+    response = client.get(f"/api/v1/posts/{uuid.uuid4()}")
+
+    assert response.status_code == 504
+
+
+def test_batch_get_posts(client, stub):
+    """Batch endpoint makes one BatchGetPosts call for all ids"""
+    posts = [make_post(), make_post()]
+    missing_id = str(uuid.uuid4())
+    stub.BatchGetPosts = AsyncMock(
+        return_value=post_service_pb2.BatchGetPostsResponse(
+            posts=posts, missing_ids=[missing_id]
+        )
+    )
+
+    response = client.get(
+        "/api/v1/posts/batch",
+        params={"ids": ",".join([post_id(posts[0]), missing_id, post_id(posts[1])])},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["id"] for p in data["posts"]] == [post_id(p) for p in posts]
+    assert data["missing_ids"] == [missing_id]
+    request = stub.BatchGetPosts.await_args.args[0]
+    assert list(request.post_ids) == [post_id(posts[0]), missing_id, post_id(posts[1])]
+
+
+def test_export_posts_streams_ndjson(client, stub):
+    """Export writes every streamed post as its own JSON line"""
+    posts = [make_post(), make_post()]
+    call = MagicMock()
+    call.read = AsyncMock(side_effect=posts + [grpc.aio.EOF])
+    stub.ExportUserPosts = MagicMock(return_value=call)
+
+    response = client.get("/api/v1/posts/export", params={"user_id": USER_ID})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [post_id(p) for p in posts]
+    request = stub.ExportUserPosts.call_args.args[0]
+    assert request.user_id == USER_ID
+
+
+def test_export_posts_unavailable(client, stub):
+    """A failure before the first post is reported as an HTTP error"""
+    call = MagicMock()
+    call.read = AsyncMock(
+        side_effect=grpc.aio.AioRpcError(
+            grpc.StatusCode.UNAVAILABLE,
+            grpc.aio.Metadata(),
+            grpc.aio.Metadata(),
+            details="connection refused",
+        )
+    )
+    stub.ExportUserPosts = MagicMock(return_value=call)
+
+    response = client.get("/api/v1/posts/export", params={"user_id": USER_ID})
+
+    assert response.status_code == 503
+
+
+def test_update_post_sends_author_and_maps_permission_denied(client, stub):
+    """Update passes the token's user id and reports someone else's post as 403"""
+    app.dependency_overrides[validate_token] = lambda: {"id": USER_ID}
+    stub.UpdatePost = AsyncMock(
+        side_effect=grpc.aio.AioRpcError(
+            grpc.StatusCode.PERMISSION_DENIED,
+            grpc.aio.Metadata(),
+            grpc.aio.Metadata(),
+            details="Post belongs to another user",
+        )
+    )
+    try:
+        response = client.put(f"/api/v1/posts/{uuid.uuid4()}", json={"title": "New"})
+    finally:
+        app.dependency_overrides.pop(validate_token, None)
+
+    assert response.status_code == 403
+    request = stub.UpdatePost.await_args.args[0]
+    assert request.user_id == USER_ID
+    assert request.title == "New"
+    # Незаданное поле не отправляется, чтобы сервис его не перезаписал
+    assert not request.HasField("content")
+
+
+def test_create_post_returns_201_with_json_body(client, stub):
+    """The orjson response keeps the create status code and the post fields"""
+    app.dependency_overrides[validate_token] = lambda: {"id": USER_ID}
+    post = make_post()
+    stub.CreatePost = AsyncMock(return_value=post)
+    try:
+        response = client.post("/api/v1/posts/", json={"title": "Title", "content": "Content"})
+    finally:
+        app.dependency_overrides.pop(validate_token, None)
+
+    assert response.status_code == 201
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "id": post_id(post),
+        "user_id": USER_ID,
+        "title": "Title",
+        "content": "Content",
+        "created_at": "2023-01-01T00:00:00",
+        "updated_at": "2023-01-01T00:00:00",
+        "like_count": 0,
+    }
+
+
+def test_openapi_schema_keeps_post_models(client):
+    """Responses bypass response_model, but the documented schema stays the same"""
+    paths = client.get("/openapi.json").json()["paths"]
+
+    list_schema = paths["/api/v1/posts/"]["get"]["responses"]["200"]["content"]
+    assert list_schema["application/json"]["schema"]["$ref"].endswith("/ListPostsResponse")
+    get_schema = paths["/api/v1/posts/{post_id}"]["get"]["responses"]["200"]["content"]
+    assert get_schema["application/json"]["schema"]["$ref"].endswith("/PostResponse")
+
+
+def test_feed_pages_through_post_service(client, stub):
+    """The feed is read for the token's user and passes the cursor through"""
+    app.dependency_overrides[validate_token] = lambda: {"id": USER_ID}
+    post = make_post()
+    stub.GetFeed = AsyncMock(
+        return_value=post_service_pb2.GetFeedResponse(posts=[post], next_cursor="next")
+    )
+    try:
+        response = client.get("/api/v1/feed", params={"page_size": 5, "cursor": "abc"})
+    finally:
+        app.dependency_overrides.pop(validate_token, None)
+
+    assert response.status_code == 200
+    assert response.json()["next_cursor"] == "next"
+    assert [p["id"] for p in response.json()["posts"]] == [post_id(post)]
+    request = stub.GetFeed.await_args.args[0]
+    assert (request.user_id, request.page_size, request.cursor) == (USER_ID, 5, "abc")
+
+
+def test_react_to_post_sends_token_user(client, stub):
+    """A reaction is set for the token's user and reports the new count"""
+    app.dependency_overrides[validate_token] = lambda: {"id": USER_ID}
+    stub.React = AsyncMock(
+        return_value=post_service_pb2.ReactionResponse(changed=True, like_count=42)
+    )
+    post = str(uuid.uuid4())
+    try:
+        response = client.put(f"/api/v1/posts/{post}/reaction", json={"reaction_type": "love"})
+    finally:
+        app.dependency_overrides.pop(validate_token, None)
+
+    assert response.status_code == 200
+    assert response.json() == {"changed": True, "like_count": 42}
+    request = stub.React.await_args.args[0]
+    assert (request.post_id, request.user_id, request.reaction_type) == (post, USER_ID, "love")
+
+
+def test_list_reactions(client, stub):
+    """Reactions are listed with user ids as UUIDs and the cursor passed through"""
+    reaction = post_service_pb2.Reaction(
+        user_id=uuid.UUID(USER_ID).bytes, reaction_type="like"
+    )
+    reaction.created_at.FromDatetime(datetime(2023, 1, 1))
+    stub.ListReactions = AsyncMock(
+        return_value=post_service_pb2.ListReactionsResponse(reactions=[reaction])
+    )
+
+    response = client.get(f"/api/v1/posts/{uuid.uuid4()}/reactions", params={"cursor": "abc"})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "reactions": [
+            {"user_id": USER_ID, "reaction_type": "like", "created_at": "2023-01-01T00:00:00"}
+        ],
+        "next_cursor": None,
+    }
+    assert stub.ListReactions.await_args.args[0].cursor == "abc"
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+from app.token_cache import TokenCache
+
+
+def make_token(expires_in=timedelta(minutes=5), sub="testuser"):
+    claims = {"sub": sub, "exp": datetime.utcnow() + expires_in}
+    return jwt.encode(claims, "secret", algorithm="HS256")
+
+
+class CountingFetch:
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def __call__(self, token):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"id": "user-id", "token": token}
+
+
+def test_cache_hit_and_miss():
+    """Second lookup of the same token is served from the cache"""
+    cache = TokenCache()
+    fetch = CountingFetch()
+    token = make_token()
+
+    async def run():
+        first = await cache.get_or_fetch(token, fetch)
+        second = await cache.get_or_fetch(token, fetch)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert fetch.calls == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_ttl_capped_by_token_expiry():
+    """Entries never outlive the token's exp claim"""
+    cache = TokenCache(ttl=60)
+    fetch = CountingFetch()
+    token = make_token(expires_in=timedelta(seconds=-1))
+
+    asyncio.run(cache.get_or_fetch(token, fetch))
+    asyncio.run(cache.get_or_fetch(token, fetch))
+
+    assert fetch.calls == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_evicts_least_recently_used():
+    """The cache never grows beyond max_size"""
+    cache = TokenCache(max_size=2)
+    fetch = CountingFetch()
+    tokens = [make_token(sub=f"user{i}") for i in range(3)]
+
+    async def run():
+        await cache.get_or_fetch(tokens[0], fetch)
+        await cache.get_or_fetch(tokens[1], fetch)
+        await cache.get_or_fetch(tokens[0], fetch)  # tokens[1] is now the oldest
+        await cache.get_or_fetch(tokens[2], fetch)
+        await cache.get_or_fetch(tokens[0], fetch)
+        await cache.get_or_fetch(tokens[1], fetch)
+
+    asyncio.run(run())
+
+    assert cache.stats()["size"] == 2
+    assert fetch.calls == 4
+
+
+def test_cache_coalesces_concurrent_lookups():
+    """Concurrent requests with one token trigger a single fetch"""
+    cache = TokenCache()
+    fetch = CountingFetch(delay=0.01)
+    token = make_token()
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_fetch(token, fetch) for _ in range(10))
+        )
+
+    results = asyncio.run(run())
+
+    assert fetch.calls == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_cache_does_not_store_errors():
+    """A failed validation is shared by waiters but not cached"""
+    cache = TokenCache()
+    fetch = CountingFetch(delay=0.01, error=HTTPException(status_code=401))
+    token = make_token()
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_fetch(token, fetch) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, HTTPException) for r in results)
+    assert fetch.calls == 1
+
+    with pytest.raises(HTTPException):
+        asyncio.run(cache.get_or_fetch(token, fetch))
+    assert fetch.calls == 2
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    """A waiting lookup still gets the result if the first one is cancelled"""
+    cache = TokenCache()
+    fetch = CountingFetch(delay=0.05)
+    token = make_token()
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_fetch(token, fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_fetch(token, fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(leader, follower, return_exceptions=True)
+        return results
+
+    leader_result, follower_result = asyncio.run(run())
+
+    assert isinstance(leader_result, asyncio.CancelledError)
+    assert follower_result["token"] == token
+    assert fetch.calls == 1
+    assert cache.stats()["size"] == 1
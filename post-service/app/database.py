@@ -1,13 +1,24 @@
 from datetime import datetime
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
 import uuid
-from cassandra.cluster import Cluster
+from collections import namedtuple
+from cassandra.cluster import EXEC_PROFILE_DEFAULT, Cluster, ExecutionProfile, ResultSet
+from cassandra.policies import DCAwareRoundRobinPolicy, TokenAwarePolicy
+from cassandra.query import BatchStatement, BatchType, named_tuple_factory
 from cassandra.auth import PlainTextAuthProvider
 from cassandra.cqlengine import connection
 from cassandra.cqlengine.management import sync_table
 from cassandra.cqlengine.models import Model
+from cassandra.cqlengine.query import LWTException
 from cassandra.cqlengine import columns
+from cassandra.util import datetime_from_uuid1, uuid_from_time
 import os
-from typing import List, Optional
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple
 
 # Get Cassandra configuration from environment variables
 CASSANDRA_HOSTS = os.getenv("CASSANDRA_HOSTS", "cassandra-db").split(",")
@@ -15,15 +26,43 @@ CASSANDRA_KEYSPACE = os.getenv("CASSANDRA_KEYSPACE", "post_service")
 CASSANDRA_USER = os.getenv("CASSANDRA_USER", "cassandra")
 CASSANDRA_PASSWORD = os.getenv("CASSANDRA_PASSWORD", "cassandra")
 
+# Bulk imports: writes in flight at once, and posts read from the input per round
+BULK_WRITE_CONCURRENCY = int(os.getenv("BULK_WRITE_CONCURRENCY", "64"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+# Timeline entries expire after this many seconds, which bounds the size of
+# a timeline partition; older posts are still reachable through ListPosts
+TIMELINE_TTL = int(os.getenv("TIMELINE_TTL", str(30 * 24 * 3600)))
+
+# Counter cells per post that reactions are spread over
+REACTION_COUNT_SHARDS = int(os.getenv("REACTION_COUNT_SHARDS", "16"))
+REACTION_TYPES = ("like", "love", "haha", "wow", "sad", "angry")
+
+# Key that signs pagination cursors; must be the same on every instance.
+# The default is only good for tests: serve() refuses to start with it
+DEFAULT_CURSOR_SECRET = "cursor-secret"
+CURSOR_SECRET = os.getenv("CURSOR_SECRET", DEFAULT_CURSOR_SECRET).encode()
+CURSOR_VERSION = b"\x01"
+CURSOR_TAG_SIZE = 16
+
+logger = logging.getLogger(__name__)
+
 def connect_to_cassandra():
     auth_provider = PlainTextAuthProvider(
         username=CASSANDRA_USER, 
         password=CASSANDRA_PASSWORD
     )
     
+    # Token-aware routing sends each prepared statement straight to a
+    # replica of its partition instead of through a coordinator hop
+    profile = ExecutionProfile(
+        load_balancing_policy=TokenAwarePolicy(DCAwareRoundRobinPolicy()),
+        row_factory=named_tuple_factory,
+    )
     cluster = Cluster(
         CASSANDRA_HOSTS, 
-        auth_provider=auth_provider
+        auth_provider=auth_provider,
+        execution_profiles={EXEC_PROFILE_DEFAULT: profile},
     )
     
     session = cluster.connect()
@@ -43,53 +82,528 @@ def connect_to_cassandra():
     
     return session
 
+def _cursor_tag(scope: str, payload: bytes) -> bytes:
+    message = CURSOR_VERSION + scope.encode() + b"|" + payload
+    return hmac.new(CURSOR_SECRET, message, hashlib.sha256).digest()[:CURSOR_TAG_SIZE]
+
+
+def encode_cursor(paging_state: Optional[bytes], scope: str = "") -> str:
+    """Wrap the driver's paging state into an opaque URL-safe token.
+
+    The token is a version byte, an HMAC of the paging state and `scope`
+    (the user or post the listing is for), and the paging state itself, so
+    only tokens issued by this service for the same listing are accepted.
+    """
+    if not paging_state:
+        return ""
+    token = CURSOR_VERSION + _cursor_tag(scope, paging_state) + paging_state
+    return base64.urlsafe_b64encode(token).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str = "") -> bytes:
+    """Turn a token produced by encode_cursor back into a paging state.
+
+    Raises ValueError if the token is malformed, was signed with another
+    key or was issued for another `scope`; such bytes are never passed on
+    to Cassandra.
+    """
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (binascii.Error, UnicodeEncodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    version = token[:1]
+    tag = token[1 : 1 + CURSOR_TAG_SIZE]
+    paging_state = token[1 + CURSOR_TAG_SIZE :]
+    if (
+        version != CURSOR_VERSION
+        or not paging_state
+        or not hmac.compare_digest(tag, _cursor_tag(scope, paging_state))
+    ):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return paging_state
+
+
+def encode_feed_cursor(created_at: datetime, post_id: uuid.UUID) -> str:
+    """Opaque token for the feed position right after the given post."""
+    return encode_cursor(f"{created_at.isoformat()}|{post_id}".encode(), "feed")
+
+
+def decode_feed_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Turn a token produced by encode_feed_cursor back into a position.
+
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        created_at, post_id = decode_cursor(cursor, "feed").decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(post_id)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def new_post_key() -> Tuple[uuid.UUID, datetime]:
+    """A time-based id for a new post and the creation time it encodes.
+
+    The time is cut to milliseconds, Cassandra's timestamp precision, so
+    created_at_from_id gives back exactly the stored created_at.
+    """
+    now = datetime.utcnow()
+    now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    return uuid_from_time(now), now
+
+
+def created_at_from_id(post_id: uuid.UUID) -> Optional[datetime]:
+    """created_at of a post with an id from new_post_key, None for older random ids."""
+    if post_id.version != 1:
+        return None
+    return datetime_from_uuid1(post_id)
+
+
 class Post(Model):
+    # v2 tables: user_id is a native UUID; see migrate_user_ids
+    __table_name__ = "posts_v2"
+
     id = columns.UUID(primary_key=True, default=uuid.uuid4)
-    user_id = columns.Text(index=True)
+    user_id = columns.UUID()
     title = columns.Text()
     content = columns.Text()
     created_at = columns.DateTime(default=datetime.utcnow)
     updated_at = columns.DateTime(default=datetime.utcnow)
+    # Copy of the post's reaction count, see LikeCountFlusher
+    like_count = columns.Integer()
 
     def to_dict(self):
         return {
             "id": str(self.id),
-            "user_id": self.user_id,
+            "user_id": str(self.user_id),
             "title": self.title,
             "content": self.content,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat()
         }
 
+class PostByUser(Model):
+    """Copy of Post partitioned by author, newest first.
+
+    Serves list_posts from a single partition instead of a secondary
+    index query on Post.user_id. Kept in sync by PostRepository.
+    """
+    __table_name__ = "posts_by_user_v2"
+
+    user_id = columns.UUID(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    id = columns.UUID(primary_key=True)
+    title = columns.Text()
+    content = columns.Text()
+    updated_at = columns.DateTime()
+    like_count = columns.Integer()
+
+    @classmethod
+    def from_post(cls, post: Post) -> "PostByUser":
+        return cls(
+            user_id=post.user_id,
+            created_at=post.created_at,
+            id=post.id,
+            title=post.title,
+            content=post.content,
+            updated_at=post.updated_at,
+        )
+
+
+class PostCount(Model):
+    """Number of posts per author, maintained by PostRepository.
+
+    Counter updates can't share a batch with regular writes, so the counter
+    may drift if a write fails in between; repair_post_counts fixes it up.
+    """
+    __table_name__ = "post_counts_v2"
+
+    user_id = columns.UUID(primary_key=True)
+    post_count = columns.Counter()
+
+
+class TimelineEntry(Model):
+    """A post in a user's home timeline, written by fan-out on post creation.
+
+    Only the key is stored; posts are read from the post table when the
+    timeline is served, so edits show up and deleted posts drop out.
+    """
+    __table_name__ = "timelines_v2"
+
+    user_id = columns.UUID(partition_key=True)
+    created_at = columns.DateTime(primary_key=True, clustering_order="DESC")
+    post_id = columns.UUID(primary_key=True, clustering_order="DESC")
+    author_id = columns.UUID()
+
+
+class PostReaction(Model):
+    """The reaction of one user to a post, at most one per (post, user)."""
+    __table_name__ = "post_reactions_v2"
+
+    post_id = columns.UUID(partition_key=True)
+    user_id = columns.UUID(primary_key=True)
+    reaction_type = columns.Text()
+    created_at = columns.DateTime()
+
+
+class PostReactionCount(Model):
+    """Number of reactions per post, split over REACTION_COUNT_SHARDS cells.
+
+    Each user always counts in the same shard, so reactions to a popular
+    post update many counter cells instead of contending for one, and the
+    total is still a single-partition read.
+    """
+    __table_name__ = "post_reaction_counts_v2"
+
+    post_id = columns.UUID(partition_key=True)
+    shard = columns.Integer(primary_key=True)
+    reactions = columns.Counter()
+
+
+class LegacyPost(Model):
+    """The v1 post table with a text user_id, read only by migrate_user_ids."""
+    __table_name__ = "post"
+
+    id = columns.UUID(primary_key=True)
+    user_id = columns.Text()
+    title = columns.Text()
+    content = columns.Text()
+    created_at = columns.DateTime()
+    updated_at = columns.DateTime()
+
+
+# Field combinations update_post can write, in column order
+UPDATE_FIELD_SETS = [("title",), ("content",), ("title", "content")]
+
+# What PostRepository returns instead of model instances: posts it creates
+# are PostRow, posts it reads are the driver's named tuple rows, which have
+# the same fields
+PostRow = namedtuple(
+    "PostRow",
+    ["id", "user_id", "title", "content", "created_at", "updated_at", "like_count"],
+    defaults=(0,),
+)
+
+
 class PostRepository:
+    """Post storage on top of the driver's execute_async.
+
+    Every query method is a coroutine: the driver's response future is
+    bridged to an asyncio future, so a request waiting on Cassandra doesn't
+    hold a thread. Queries are prepared once here and return the driver's
+    named tuple rows (or PostRow) as they are; the cqlengine models only
+    define the tables and serve the offline maintenance helpers at the
+    bottom.
+    """
+
     def __init__(self):
         self.session = connect_to_cassandra()
         sync_table(Post)
-    
-    def create_post(self, user_id: str, title: str, content: str) -> Post:
-        post = Post.create(
+        sync_table(PostByUser)
+        sync_table(PostCount)
+        sync_table(TimelineEntry)
+        sync_table(PostReaction)
+        sync_table(PostReactionCount)
+
+        post_table = Post.column_family_name()
+        by_user_table = PostByUser.column_family_name()
+        counts_table = PostCount.column_family_name()
+        timeline_table = TimelineEntry.column_family_name()
+        reactions_table = PostReaction.column_family_name()
+        reaction_counts_table = PostReactionCount.column_family_name()
+        prepare = self.session.prepare
+        self._select_post = prepare(f"SELECT * FROM {post_table} WHERE id = ?")
+        self._insert_post = prepare(
+            f"INSERT INTO {post_table} "
+            "(id, user_id, title, content, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        self._select_post_key = prepare(
+            f"SELECT user_id, created_at FROM {post_table} WHERE id = ?"
+        )
+        self._delete_post = prepare(f"DELETE FROM {post_table} WHERE id = ? IF user_id = ?")
+        self._insert_post_by_user = prepare(
+            f"INSERT INTO {by_user_table} "
+            "(user_id, created_at, id, title, content, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        self._delete_post_by_user = prepare(
+            f"DELETE FROM {by_user_table} WHERE user_id = ? AND created_at = ? AND id = ?"
+        )
+        self._select_posts_by_user = prepare(
+            f"SELECT * FROM {by_user_table} WHERE user_id = ?"
+        )
+        self._select_posts_by_user_limit = prepare(
+            f"SELECT * FROM {by_user_table} WHERE user_id = ? LIMIT ?"
+        )
+        self._select_posts_by_user_until = prepare(
+            f"SELECT * FROM {by_user_table} WHERE user_id = ? AND created_at <= ? LIMIT ?"
+        )
+        self._insert_timeline_entry = prepare(
+            f"INSERT INTO {timeline_table} (user_id, created_at, post_id, author_id) "
+            "VALUES (?, ?, ?, ?) USING TTL ?"
+        )
+        self._select_timeline = prepare(
+            f"SELECT created_at, post_id FROM {timeline_table} WHERE user_id = ? LIMIT ?"
+        )
+        self._select_timeline_after = prepare(
+            f"SELECT created_at, post_id FROM {timeline_table} "
+            "WHERE user_id = ? AND (created_at, post_id) < (?, ?) LIMIT ?"
+        )
+        self._insert_reaction = prepare(
+            f"INSERT INTO {reactions_table} (post_id, user_id, reaction_type, created_at) "
+            "VALUES (?, ?, ?, ?) IF NOT EXISTS"
+        )
+        self._update_reaction = prepare(
+            f"UPDATE {reactions_table} SET reaction_type = ? "
+            "WHERE post_id = ? AND user_id = ? IF EXISTS"
+        )
+        self._delete_reaction = prepare(
+            f"DELETE FROM {reactions_table} WHERE post_id = ? AND user_id = ? IF EXISTS"
+        )
+        self._select_reactions = prepare(
+            f"SELECT user_id, reaction_type, created_at FROM {reactions_table} WHERE post_id = ?"
+        )
+        self._select_reaction_counts = prepare(
+            f"SELECT reactions FROM {reaction_counts_table} WHERE post_id = ?"
+        )
+        self._update_reaction_count = prepare(
+            f"UPDATE {reaction_counts_table} SET reactions = reactions + ? "
+            "WHERE post_id = ? AND shard = ?"
+        )
+        self._update_like_count = prepare(
+            f"UPDATE {post_table} SET like_count = ? WHERE id = ? IF EXISTS"
+        )
+        self._update_like_count_by_user = prepare(
+            f"UPDATE {by_user_table} SET like_count = ? "
+            "WHERE user_id = ? AND created_at = ? AND id = ? IF EXISTS"
+        )
+        self._select_count = prepare(
+            f"SELECT post_count FROM {counts_table} WHERE user_id = ?"
+        )
+        self._update_count = prepare(
+            f"UPDATE {counts_table} SET post_count = post_count + ? WHERE user_id = ?"
+        )
+
+        # One pair of (post, posts_by_user) updates per set of changed fields,
+        # so an edit writes only the columns it changes
+        self._update_post = {}
+        self._update_post_by_user = {}
+        for fields in UPDATE_FIELD_SETS:
+            assignments = ", ".join(f"{field} = ?" for field in fields + ("updated_at",))
+            self._update_post[fields] = prepare(
+                f"UPDATE {post_table} SET {assignments} WHERE id = ? IF user_id = ?"
+            )
+            self._update_post_by_user[fields] = prepare(
+                f"UPDATE {by_user_table} SET {assignments} "
+                "WHERE user_id = ? AND created_at = ? AND id = ? IF EXISTS"
+            )
+
+    async def _execute(self, statement, parameters=None, paging_state=None) -> ResultSet:
+        """Run a statement with execute_async and await its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        response_future = self.session.execute_async(
+            statement, parameters, paging_state=paging_state
+        )
+
+        def resolve():
+            if future.cancelled():
+                return
+            try:
+                future.set_result(response_future.result())
+            except Exception as e:
+                future.set_exception(e)
+
+        # Callbacks run on the driver's I/O thread
+        def on_done(_):
+            loop.call_soon_threadsafe(resolve)
+
+        response_future.add_callbacks(on_done, on_done)
+        return await future
+
+    def _write_post_batch(self, post: PostRow) -> BatchStatement:
+        # Both tables in one logged batch, as cqlengine's BatchQuery did
+        batch = BatchStatement(batch_type=BatchType.LOGGED)
+        batch.add(
+            self._insert_post,
+            (post.id, post.user_id, post.title, post.content, post.created_at, post.updated_at),
+        )
+        batch.add(
+            self._insert_post_by_user,
+            (post.user_id, post.created_at, post.id, post.title, post.content, post.updated_at),
+        )
+        return batch
+
+    async def create_post(self, user_id: uuid.UUID, title: str, content: str) -> PostRow:
+        post_id, now = new_post_key()
+        post = PostRow(
+            id=post_id,
             user_id=user_id,
             title=title,
-            content=content
+            content=content,
+            created_at=now,
+            updated_at=now,
         )
+        await self._execute(self._write_post_batch(post))
+        await self._change_post_count(user_id, 1)
         return post
-    
-    def get_post(self, post_id: str) -> Optional[Post]:
+
+    async def create_posts(
+        self,
+        items: AsyncIterable[Tuple[Optional[uuid.UUID], str, str]],
+        concurrency: int = BULK_WRITE_CONCURRENCY,
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> AsyncIterator[Tuple[Optional[PostRow], Optional[str]]]:
+        """Create posts from (user_id, title, content) tuples.
+
+        Yields (post, None) or (None, error) per item, in input order. Items
+        are consumed `chunk_size` at a time, so memory doesn't grow with the
+        input. A post is created only if both its rows were written; if just
+        one of them was, the item is reported as failed and that row is
+        deleted again. A row that can't be deleted is logged, and one left in
+        posts_by_user is counted, so the counter still matches the listing.
+        """
+        chunk = []
+        async for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                for result in await self._create_chunk(chunk, concurrency):
+                    yield result
+                chunk = []
+        if chunk:
+            for result in await self._create_chunk(chunk, concurrency):
+                yield result
+
+    async def _create_chunk(
+        self, items: List[Tuple[Optional[uuid.UUID], str, str]], concurrency: int
+    ) -> List[Tuple[Optional[PostRow], Optional[str]]]:
+        # The two rows of a post live in different partitions, so instead of
+        # a logged batch per post they are plain inserts run concurrently.
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def write(statement, parameters):
+            async with semaphore:
+                await self._execute(statement, parameters)
+
+        results = []
+        writes = []
+        for user_id, title, content in items:
+            if not user_id or not title:
+                results.append((None, "a valid user_id and a title are required"))
+                continue
+            post_id, now = new_post_key()
+            post = PostRow(
+                id=post_id,
+                user_id=user_id,
+                title=title,
+                content=content,
+                created_at=now,
+                updated_at=now,
+            )
+            results.append((post, None))
+            writes.append(
+                write(self._insert_post, (post.id, user_id, title, content, now, now))
+            )
+            writes.append(
+                write(
+                    self._insert_post_by_user,
+                    (user_id, now, post.id, title, content, now),
+                )
+            )
+
+        outcomes = iter(await asyncio.gather(*writes, return_exceptions=True))
+        created = {}
+        # Posts with only one of their rows written, and the statement
+        # removing the row that was
+        half_written = []
+        for index, (post, error) in enumerate(results):
+            if post is None:
+                continue
+            post_outcome, by_user_outcome = next(outcomes), next(outcomes)
+            post_failed = isinstance(post_outcome, Exception)
+            by_user_failed = isinstance(by_user_outcome, Exception)
+            if not post_failed and not by_user_failed:
+                created[post.user_id] = created.get(post.user_id, 0) + 1
+                continue
+            results[index] = (None, str(post_outcome if post_failed else by_user_outcome))
+            if not post_failed:
+                half_written.append((post, self._delete_post, (post.id, post.user_id)))
+            elif not by_user_failed:
+                half_written.append(
+                    (post, self._delete_post_by_user, (post.user_id, post.created_at, post.id))
+                )
+
+        cleanups = await asyncio.gather(
+            *(write(statement, parameters) for _, statement, parameters in half_written),
+            return_exceptions=True,
+        )
+        for (post, statement, _), outcome in zip(half_written, cleanups):
+            if not isinstance(outcome, Exception):
+                continue
+            logger.warning(
+                f"Post {post.id} of user {post.user_id} was written to only one table "
+                f"and could not be removed: {outcome}"
+            )
+            # The counter follows posts_by_user, so a row left there is counted
+            if statement is self._delete_post_by_user:
+                created[post.user_id] = created.get(post.user_id, 0) + 1
+
+        for user_id, count in created.items():
+            await self._change_post_count(user_id, count)
+        return results
+
+    async def get_post(self, post_id: str) -> Optional[PostRow]:
         try:
-            return Post.get(id=uuid.UUID(post_id))
-        except Post.DoesNotExist:
+            key = uuid.UUID(post_id)
+        except ValueError:
             return None
-    
-    def list_posts(self, user_id: str, page: int = 1, page_size: int = 10) -> tuple[List[Post], int]:
-        query = Post.objects.filter(user_id=user_id)
-        total = query.count() # Get total count first
-
-        # Fetch enough items to cover up to the desired page
-        # Note: This can be inefficient for large page numbers in Cassandra
-        # A better approach might involve cursor-based pagination (paging state)
-        # if performance becomes an issue.
+        row = (await self._execute(self._select_post, (key,))).one()
+        return row
+
+    async def get_posts(self, post_ids: List[str]) -> tuple[List[PostRow], List[str]]:
+        """Fetch several posts with concurrent single-partition reads.
+
+        Returns the found posts in request order and the ids that don't
+        exist (including ones that aren't valid UUIDs).
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        found = await asyncio.gather(*(self.get_post(post_id) for post_id in post_ids))
+
+        posts, missing_ids = [], []
+        for post_id, post in zip(post_ids, found):
+            if post is None:
+                missing_ids.append(post_id)
+            else:
+                posts.append(post)
+        return posts, missing_ids
+
+    async def list_posts(
+        self,
+        user_id: uuid.UUID,
+        page: int = 1,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+    ) -> tuple[List[PostRow], int, Optional[str]]:
+        """Raises ValueError for a cursor that isn't one of this user's."""
+        # Checked before any query, so a bad cursor never reaches Cassandra
+        paging_state = decode_cursor(cursor, str(user_id)) if cursor else None
+        total = await self.count_posts(user_id)
+
+        # Cursor mode (and the first page, which is the same in both modes):
+        # one bounded read that resumes from the driver's paging state.
+        if cursor or page <= 1:
+            posts, next_paging_state = await self._fetch_page(
+                user_id, page_size, paging_state
+            )
+            return posts, total, encode_cursor(next_paging_state, str(user_id)) or None
+
+        # Legacy page/page_size mode for old clients: fetch enough items to
+        # cover up to the desired page and drop the preceding ones.
         limit_needed = page * page_size
-        fetched_posts = list(query.limit(limit_needed))
+        statement = self._select_posts_by_user_limit.bind((user_id, limit_needed))
+        statement.fetch_size = limit_needed
+        result = await self._execute(statement)
+        fetched_posts = result.current_rows
 
         # Calculate the slice start index
         start_index = (page - 1) * page_size
@@ -98,25 +612,432 @@ class PostRepository:
         posts_for_page = fetched_posts[start_index:] 
         # We don't need end_index because limit already capped the total fetched items
 
-        return posts_for_page, total
-    
-    def update_post(self, post_id: str, title: str, content: str) -> Optional[Post]:
+        return posts_for_page, total, None
+
+    async def _fetch_page(
+        self, user_id: uuid.UUID, page_size: int, paging_state: Optional[bytes] = None
+    ) -> tuple[List[PostRow], Optional[bytes]]:
+        statement = self._select_posts_by_user.bind((user_id,))
+        statement.fetch_size = page_size
+        result = await self._execute(statement, paging_state=paging_state)
+        return result.current_rows, result.paging_state
+
+    async def iter_posts_by_user(
+        self, user_id: uuid.UUID, fetch_size: int = 500
+    ) -> AsyncIterator[PostRow]:
+        """Yield all posts of a user, newest first.
+
+        The next page of `fetch_size` rows is requested only when the
+        current one is consumed, so at most one page is held in memory.
+        """
+        paging_state = None
+        while True:
+            posts, paging_state = await self._fetch_page(user_id, fetch_size, paging_state)
+            for post in posts:
+                yield post
+            if not paging_state:
+                return
+
+    async def add_to_timelines(
+        self,
+        user_ids: List[uuid.UUID],
+        post: PostRow,
+        concurrency: int = BULK_WRITE_CONCURRENCY,
+    ) -> int:
+        """Insert `post` into the timelines of `user_ids`.
+
+        Each entry is a separate partition, so the inserts run concurrently,
+        at most `concurrency` at a time. Returns how many were written; if
+        any insert fails, the first error is raised once all of them have
+        finished. The inserts are idempotent, so the caller can retry the
+        whole list.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def write(user_id):
+            async with semaphore:
+                await self._execute(
+                    self._insert_timeline_entry,
+                    (user_id, post.created_at, post.id, post.user_id, TIMELINE_TTL),
+                )
+
+        outcomes = await asyncio.gather(
+            *(write(user_id) for user_id in user_ids), return_exceptions=True
+        )
+        failed = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        if failed:
+            logger.warning(
+                f"Post {post.id}: {len(failed)} of {len(user_ids)} timeline writes failed: {failed[0]}"
+            )
+            raise failed[0]
+        return len(user_ids)
+
+    async def get_feed(
+        self,
+        user_id: uuid.UUID,
+        page_size: int = 20,
+        cursor: Optional[str] = None,
+        pull_author_ids: List[uuid.UUID] = (),
+    ) -> Tuple[List[PostRow], Optional[str]]:
+        """A page of the home timeline of `user_id`, newest first.
+
+        Reads one page of the user's own timeline partition and merges in the
+        latest posts of `pull_author_ids`, authors with too many followers to
+        fan out to (see TimelineFanout). Posts deleted since they were fanned
+        out are left out, so a page may come back short; the cursor still
+        moves past them. Raises ValueError for a malformed cursor.
+        """
+        position = decode_feed_cursor(cursor) if cursor else None
+
+        if position is None:
+            timeline_query = self._execute(self._select_timeline, (user_id, page_size))
+        else:
+            timeline_query = self._execute(
+                self._select_timeline_after, (user_id, *position, page_size)
+            )
+        timeline, *pulled = await asyncio.gather(
+            timeline_query,
+            *(
+                self._latest_posts_by_user(author_id, page_size, position)
+                for author_id in pull_author_ids
+            ),
+        )
+
+        # (created_at, post_id) -> the post if it was already read, else None
+        candidates = {(row.created_at, row.post_id): None for row in timeline}
+        for posts in pulled:
+            for post in posts:
+                candidates[(post.created_at, post.id)] = post
+        keys = sorted(candidates, reverse=True)[:page_size]
+
+        to_read = [str(key[1]) for key in keys if candidates[key] is None]
+        found = {}
+        if to_read:
+            posts, _ = await self.get_posts(to_read)
+            found = {post.id: post for post in posts}
+
+        page = []
+        for key in keys:
+            post = candidates[key] or found.get(key[1])
+            if post is not None:
+                page.append(post)
+        next_cursor = encode_feed_cursor(*keys[-1]) if len(keys) == page_size else None
+        return page, next_cursor
+
+    async def _latest_posts_by_user(
+        self,
+        user_id: uuid.UUID,
+        limit: int,
+        position: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> List[PostRow]:
+        # posts_by_user clusters ids ascending within a created_at, unlike the
+        # timeline, so the resume point is applied here rather than in CQL
+        if position is None:
+            statement = self._select_posts_by_user_limit.bind((user_id, limit))
+        else:
+            statement = self._select_posts_by_user_until.bind(
+                (user_id, position[0], limit + 1)
+            )
+        rows = (await self._execute(statement)).current_rows
+        if position is not None:
+            rows = [row for row in rows if (row.created_at, row.id) < position]
+        return rows[:limit]
+
+    async def _post_key(self, post_id: uuid.UUID) -> Optional[Tuple[uuid.UUID, datetime]]:
+        """(user_id, created_at) of an existing post, read from the post table."""
+        row = (await self._execute(self._select_post_key, (post_id,))).one()
+        return (row.user_id, row.created_at) if row is not None else None
+
+    async def update_post(
+        self,
+        post_id: str,
+        title: Optional[str] = None,
+        content: Optional[str] = None,
+        user_id: Optional[uuid.UUID] = None,
+    ) -> Optional[PostRow]:
+        """Set the given fields of a post with conditional writes.
+
+        Only the fields that aren't None (and updated_at) are written.
+        Returns None if the post doesn't exist and raises PermissionError if
+        `user_id` is given and isn't the author. For a post with a time-based
+        id and a known author, both tables are updated by concurrent
+        lightweight transactions without reading the post first; older posts
+        and calls without `user_id` read it first.
+        """
+        changes = {
+            field: value
+            for field, value in (("title", title), ("content", content))
+            if value is not None
+        }
+        if not changes:
+            raise ValueError("Nothing to update")
         try:
-            post = Post.get(id=uuid.UUID(post_id))
-            post.title = title
-            post.content = content
-            post.updated_at = datetime.utcnow()
-            post.save()
-            return post
-        except Post.DoesNotExist:
+            key = uuid.UUID(post_id)
+        except ValueError:
             return None
-    
-    def delete_post(self, post_id: str, user_id: str) -> bool:
+
+        current = None
+        created_at = created_at_from_id(key)
+        if not user_id or created_at is None:
+            current = await self.get_post(post_id)
+            if current is None:
+                return None
+            user_id = user_id or current.user_id
+            created_at = current.created_at
+
+        fields = tuple(changes)
+        now = datetime.utcnow()
+        values = tuple(changes.values()) + (now,)
+        # The posts_by_user row exists only if user_id is the author, and IF
+        # EXISTS keeps the update from creating one when it isn't
+        queries = [
+            self._execute(self._update_post[fields], values + (key, user_id)),
+            self._execute(
+                self._update_post_by_user[fields],
+                values + (user_id, created_at, key),
+            ),
+        ]
+        if current is None and len(changes) < 2:
+            # The response needs the unchanged field too; read it alongside
+            queries.append(self.get_post(post_id))
+        result, by_user_result, *read = await asyncio.gather(*queries)
+
+        if not result.was_applied:
+            self._raise_if_not_author(result, post_id)
+            return None
+        if not by_user_result.was_applied:
+            logger.warning(f"Post {post_id} is missing from posts_by_user")
+
+        current = current or (read[0] if read else None)
+        return PostRow(
+            id=key,
+            user_id=user_id,
+            title=changes.get("title", getattr(current, "title", "")),
+            content=changes.get("content", getattr(current, "content", "")),
+            created_at=created_at,
+            updated_at=now,
+            like_count=getattr(current, "like_count", None) or 0,
+        )
+
+    async def delete_post(self, post_id: str, user_id: uuid.UUID) -> bool:
+        """Delete a post of `user_id` with a conditional delete.
+
+        Returns False if the post doesn't exist and raises PermissionError if
+        it belongs to someone else.
+        """
         try:
-            post = Post.get(id=uuid.UUID(post_id))
-            if post.user_id != user_id:
+            key = uuid.UUID(post_id)
+        except ValueError:
+            return False
+
+        created_at = created_at_from_id(key)
+        if created_at is None:
+            existing = await self._post_key(key)
+            if existing is None:
                 return False
-            post.delete()
-            return True
-        except Post.DoesNotExist:
+            created_at = existing[1]
+
+        # Deleting from the caller's own posts_by_user partition can't touch
+        # anyone else's post, so it doesn't need to wait for the condition
+        result, _ = await asyncio.gather(
+            self._execute(self._delete_post, (key, user_id)),
+            self._execute(self._delete_post_by_user, (user_id, created_at, key)),
+        )
+        if not result.was_applied:
+            self._raise_if_not_author(result, post_id)
+            return False
+
+        await self._change_post_count(user_id, -1)
+        return True
+
+    @staticmethod
+    def _raise_if_not_author(result: ResultSet, post_id: str):
+        # A failed IF user_id = ? returns the current user_id, null if the
+        # post doesn't exist
+        if getattr(result.one(), "user_id", None) is not None:
+            raise PermissionError(f"Post {post_id} belongs to another user")
+
+    async def react(
+        self, post_id: str, user_id: uuid.UUID, reaction_type: str = "like"
+    ) -> Optional[Tuple[bool, int]]:
+        """Set the reaction of `user_id` to a post.
+
+        Returns (changed, like_count), or None if the post doesn't exist.
+        Reacting again with the same type changes nothing; with another
+        type it only replaces the type, so every user counts once.
+        """
+        try:
+            key = uuid.UUID(post_id)
+        except ValueError:
+            return None
+        if await self._post_key(key) is None:
+            return None
+
+        result = await self._execute(
+            self._insert_reaction, (key, user_id, reaction_type, datetime.utcnow())
+        )
+        if result.was_applied:
+            await self._execute(
+                self._update_reaction_count, (1, key, self._reaction_shard(user_id))
+            )
+            changed = True
+        elif result.one().reaction_type != reaction_type:
+            result = await self._execute(
+                self._update_reaction, (reaction_type, key, user_id)
+            )
+            changed = result.was_applied
+        else:
+            changed = False
+        return changed, await self.count_likes(key)
+
+    async def unreact(
+        self, post_id: str, user_id: uuid.UUID
+    ) -> Optional[Tuple[bool, int]]:
+        """Remove the reaction of `user_id`.
+
+        Returns (changed, like_count), or None if the post doesn't exist.
+        """
+        try:
+            key = uuid.UUID(post_id)
+        except ValueError:
+            return None
+        result = await self._execute(self._delete_reaction, (key, user_id))
+        if result.was_applied:
+            await self._execute(
+                self._update_reaction_count, (-1, key, self._reaction_shard(user_id))
+            )
+        elif await self._post_key(key) is None:
+            # Only looked up when there was nothing to delete
+            return None
+        return result.was_applied, await self.count_likes(key)
+
+    async def list_reactions(
+        self, post_id: str, page_size: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[list, Optional[str]]:
+        """A page of the reactions to a post, in user_id order.
+
+        Raises ValueError for an invalid post id or cursor.
+        """
+        key = uuid.UUID(post_id)
+        paging_state = decode_cursor(cursor, str(key)) if cursor else None
+        statement = self._select_reactions.bind((key,))
+        statement.fetch_size = page_size
+        result = await self._execute(statement, paging_state=paging_state)
+        return result.current_rows, encode_cursor(result.paging_state, str(key)) or None
+
+    async def count_likes(self, post_id: uuid.UUID) -> int:
+        rows = await self._execute(self._select_reaction_counts, (post_id,))
+        return sum(row.reactions for row in rows)
+
+    async def write_like_count(self, post_id: uuid.UUID) -> bool:
+        """Copy the post's reaction count into its post and posts_by_user rows.
+
+        The value written is the current total, not a delta, so running this
+        late, twice or from several processes at once is harmless. Returns
+        False if the post no longer exists.
+        """
+        post_key, like_count = await asyncio.gather(
+            self._post_key(post_id), self.count_likes(post_id)
+        )
+        if post_key is None:
             return False
+        user_id, created_at = post_key
+        # IF EXISTS so a post deleted in the meantime isn't brought back
+        await asyncio.gather(
+            self._execute(self._update_like_count, (like_count, post_id)),
+            self._execute(
+                self._update_like_count_by_user,
+                (like_count, user_id, created_at, post_id),
+            ),
+        )
+        return True
+
+    @staticmethod
+    def _reaction_shard(user_id: uuid.UUID) -> int:
+        return user_id.int % REACTION_COUNT_SHARDS
+
+    async def count_posts(self, user_id: uuid.UUID) -> int:
+        row = (await self._execute(self._select_count, (user_id,))).one()
+        return row.post_count if row is not None else 0
+
+    async def _change_post_count(self, user_id: uuid.UUID, delta: int):
+        await self._execute(self._update_count, (delta, user_id))
+
+    def repair_post_counts(self) -> int:
+        """Recompute post_counts from posts_by_user.
+
+        Meant to be run offline: writes made while it runs may be counted
+        twice. Returns the number of counters that were corrected.
+        """
+        actual = {}
+        for post in PostByUser.objects.all().fetch_size(500):
+            actual[post.user_id] = actual.get(post.user_id, 0) + 1
+
+        stored = {
+            counter.user_id: counter.post_count
+            for counter in PostCount.objects.all().fetch_size(500)
+        }
+
+        repaired = 0
+        for user_id in actual.keys() | stored.keys():
+            delta = actual.get(user_id, 0) - stored.get(user_id, 0)
+            if delta:
+                self.session.execute(self._update_count, (delta, user_id))
+                repaired += 1
+        return repaired
+
+    def backfill_posts_by_user(self) -> int:
+        """Copy posts created before posts_by_user existed into it.
+
+        Reads the post table 500 rows at a time. Rows already in
+        posts_by_user are left as they are, so it is safe to rerun. Returns
+        the number of posts copied.
+        """
+        copied = 0
+        for post in Post.objects.all().fetch_size(500):
+            try:
+                PostByUser.from_post(post).if_not_exists().save()
+            except LWTException:
+                continue
+            copied += 1
+        return copied
+
+    def migrate_user_ids(self) -> Tuple[int, int]:
+        """Copy posts from the v1 tables into the v2 ones with UUID user_ids.
+
+        Posts whose user_id isn't a UUID are skipped and logged. Counters
+        are then rebuilt from posts_by_user_v2. Meant to be run offline,
+        once, before switching traffic to this version. It is safe to rerun:
+        posts already in the v2 tables are left as they are, so edits made
+        there since aren't overwritten. Returns the number of posts copied
+        and the number skipped for their user_id.
+        """
+        copied = skipped = 0
+        for legacy in LegacyPost.objects.all().fetch_size(500):
+            try:
+                user_id = uuid.UUID(legacy.user_id)
+            except (TypeError, ValueError):
+                logger.warning(f"Skipping post {legacy.id}: user_id {legacy.user_id!r} is not a UUID")
+                skipped += 1
+                continue
+            post = Post(
+                id=legacy.id,
+                user_id=user_id,
+                title=legacy.title,
+                content=legacy.content,
+                created_at=legacy.created_at,
+                updated_at=legacy.updated_at,
+            )
+            try:
+                post.if_not_exists().save()
+            except LWTException:
+                # Copied by an earlier run
+                continue
+            try:
+                PostByUser.from_post(post).if_not_exists().save()
+            except LWTException:
+                pass
+            copied += 1
+
+        self.repair_post_counts()
+        return copied, skipped
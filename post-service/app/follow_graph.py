@@ -0,0 +1,106 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Tuple
+
+import httpx
+
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8000")
+USER_SERVICE_TIMEOUT = float(os.getenv("USER_SERVICE_TIMEOUT", "5"))
+# Largest page user-service serves (its own FOLLOW_LIST_MAX_LIMIT); it
+# answers 422 to anything above, so page sizes here are capped to it
+FOLLOW_LIST_MAX_LIMIT = int(os.getenv("FOLLOW_LIST_MAX_LIMIT", "200"))
+# Followers requested per page while fanning out a post
+FOLLOWER_PAGE_SIZE = min(
+    int(os.getenv("FOLLOWER_PAGE_SIZE", "200")), FOLLOW_LIST_MAX_LIMIT
+)
+# Authors with at least this many followers are not fanned out; their
+# followers pull their posts when reading the feed instead
+FANOUT_MAX_FOLLOWERS = int(os.getenv("FANOUT_MAX_FOLLOWERS", "10000"))
+# How long the list of such authors a user follows is reused between reads
+PULL_AUTHORS_TTL = float(os.getenv("PULL_AUTHORS_TTL", "60"))
+PULL_AUTHORS_CACHE_SIZE = int(os.getenv("PULL_AUTHORS_CACHE_SIZE", "10000"))
+
+
+class FollowGraph:
+    """Read-only client for the follow graph kept by user-service."""
+
+    def __init__(
+        self,
+        base_url: str = USER_SERVICE_URL,
+        max_followers: int = FANOUT_MAX_FOLLOWERS,
+        client: httpx.AsyncClient = None,
+    ):
+        self.max_followers = max_followers
+        self.client = client or httpx.AsyncClient(
+            base_url=base_url, timeout=USER_SERVICE_TIMEOUT
+        )
+        self._pull_authors: "OrderedDict[uuid.UUID, Tuple[float, List[uuid.UUID]]]" = (
+            OrderedDict()
+        )
+
+    async def follower_count(self, user_id: uuid.UUID) -> int:
+        response = await self.client.get(f"/users/{user_id}/follow-counts")
+        response.raise_for_status()
+        return response.json()["follower_count"]
+
+    async def follower_page(
+        self,
+        user_id: uuid.UUID,
+        cursor: Optional[str] = None,
+        page_size: int = FOLLOWER_PAGE_SIZE,
+    ) -> Tuple[List[uuid.UUID], Optional[str]]:
+        """One page of follower ids of `user_id` and the cursor of the next.
+
+        The cursor is None after the last page.
+        """
+        return await self._page(
+            f"/users/{user_id}/followers",
+            {"limit": min(page_size, FOLLOW_LIST_MAX_LIMIT)},
+            cursor,
+        )
+
+    async def pull_author_ids(self, user_id: uuid.UUID) -> List[uuid.UUID]:
+        """Accounts `user_id` follows that are too big to fan out.
+
+        Cached for PULL_AUTHORS_TTL seconds per user, so a new follow of such
+        an account may take that long to show up in the feed.
+        """
+        entry = self._pull_authors.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._pull_authors.move_to_end(user_id)
+            return entry[1]
+
+        author_ids = []
+        async for page in self._iter_pages(
+            f"/users/{user_id}/following",
+            {"limit": FOLLOWER_PAGE_SIZE, "min_follower_count": self.max_followers},
+        ):
+            author_ids.extend(page)
+
+        self._pull_authors[user_id] = (time.monotonic() + PULL_AUTHORS_TTL, author_ids)
+        self._pull_authors.move_to_end(user_id)
+        while len(self._pull_authors) > PULL_AUTHORS_CACHE_SIZE:
+            self._pull_authors.popitem(last=False)
+        return author_ids
+
+    async def _iter_pages(self, path: str, params: dict) -> AsyncIterator[List[uuid.UUID]]:
+        cursor = None
+        while True:
+            page, cursor = await self._page(path, params, cursor)
+            yield page
+            if not cursor:
+                return
+
+    async def _page(
+        self, path: str, params: dict, cursor: Optional[str]
+    ) -> Tuple[List[uuid.UUID], Optional[str]]:
+        page_params = dict(params, cursor=cursor) if cursor else params
+        response = await self.client.get(path, params=page_params)
+        response.raise_for_status()
+        data = response.json()
+        return [uuid.UUID(user["id"]) for user in data["users"]], data.get("next_cursor") or None
+
+    async def close(self):
+        await self.client.aclose()
@@ -1,105 +1,224 @@
+import asyncio
 import grpc
+import httpx
+from cassandra import InvalidRequest
 import uuid
-from concurrent import futures
 import os
 import sys
 from datetime import datetime
 import logging
+from typing import Optional
 
 # Add the directory to sys.path to import the generated code
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the generated gRPC code
 from app.proto import post_service_pb2, post_service_pb2_grpc
-from app.database import PostRepository
+from app.database import CURSOR_SECRET, DEFAULT_CURSOR_SECRET, REACTION_TYPES, PostRepository
+from app.follow_graph import FollowGraph
+from app.reactions import LikeCountFlusher
+from app.timeline import TimelineFanout
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Upper bound for BatchGetPosts, each id is a separate concurrent read
+MAX_BATCH_GET_POSTS = int(os.getenv("MAX_BATCH_GET_POSTS", "100"))
+# Cassandra page size for ExportUserPosts; bounds the rows held in memory
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "500"))
+MAX_EXPORT_FETCH_SIZE = int(os.getenv("MAX_EXPORT_FETCH_SIZE", "5000"))
+# GetFeed page size when the request leaves it at 0, and its upper bound
+FEED_PAGE_SIZE = int(os.getenv("FEED_PAGE_SIZE", "20"))
+MAX_FEED_PAGE_SIZE = int(os.getenv("MAX_FEED_PAGE_SIZE", "100"))
+# ListReactions page size when the request leaves it at 0, and its upper bound
+REACTIONS_PAGE_SIZE = int(os.getenv("REACTIONS_PAGE_SIZE", "100"))
+MAX_REACTIONS_PAGE_SIZE = int(os.getenv("MAX_REACTIONS_PAGE_SIZE", "1000"))
+
+
+def post_to_proto(post) -> post_service_pb2.Post:
+    message = post_service_pb2.Post(
+        id=post.id.bytes,
+        user_id=post.user_id.bytes,
+        title=post.title,
+        content=post.content,
+    )
+    message.created_at.FromDatetime(post.created_at)
+    message.updated_at.FromDatetime(post.updated_at)
+    # Null until the first reaction's count is written, see LikeCountFlusher
+    message.like_count = post.like_count or 0
+    return message
+
+
+def parse_user_id(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def invalid_user_id(context, value: str):
+    context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+    context.set_details(f"Invalid user_id: {value!r}")
+
+
 class PostServiceServicer(post_service_pb2_grpc.PostServiceServicer):
     def __init__(self):
         self.post_repository = PostRepository()
+        self.follow_graph = FollowGraph()
+        self.timeline = TimelineFanout(self.post_repository, self.follow_graph)
+        self.like_counts = LikeCountFlusher(self.post_repository)
 
-    def CreatePost(self, request, context):
+    async def CreatePost(self, request, context):
         logger.info(f"Creating post for user {request.user_id}")
-        post = self.post_repository.create_post(
-            user_id=request.user_id, title=request.title, content=request.content
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.Post()
+
+        post = await self.post_repository.create_post(
+            user_id=user_id, title=request.title, content=request.content
         )
+        # Followers' timelines are written in the background
+        await self.timeline.submit(post)
+
+        return post_to_proto(post)
 
-        return post_service_pb2.Post(
-            id=str(post.id),
-            user_id=post.user_id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at.isoformat(),
-            updated_at=post.updated_at.isoformat(),
+    async def BulkCreatePosts(self, request_iterator, context):
+        logger.info("Bulk creating posts")
+        items = (
+            (parse_user_id(request.user_id), request.title, request.content)
+            async for request in request_iterator
         )
 
-    def GetPost(self, request, context):
+        response = post_service_pb2.BulkCreatePostsResponse()
+        index = 0
+        async for post, error in self.post_repository.create_posts(items):
+            if post is None:
+                response.results.add(index=index, error=error)
+                response.failed += 1
+            else:
+                response.results.add(index=index, post_id=str(post.id))
+                response.created += 1
+            index += 1
+
+        logger.info(f"Bulk created {response.created} posts, {response.failed} failed")
+        return response
+
+    async def GetPost(self, request, context):
         logger.info(f"Getting post {request.post_id}")
-        post = self.post_repository.get_post(request.post_id)
+        post = await self.post_repository.get_post(request.post_id)
 
         if post is None:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Post with ID {request.post_id} not found")
             return post_service_pb2.Post()
 
-        return post_service_pb2.Post(
-            id=str(post.id),
-            user_id=post.user_id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at.isoformat(),
-            updated_at=post.updated_at.isoformat(),
+        return post_to_proto(post)
+
+    async def BatchGetPosts(self, request, context):
+        logger.info(f"Getting {len(request.post_ids)} posts")
+        if len(request.post_ids) > MAX_BATCH_GET_POSTS:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"At most {MAX_BATCH_GET_POSTS} post ids per request")
+            return post_service_pb2.BatchGetPostsResponse()
+
+        posts, missing_ids = await self.post_repository.get_posts(list(request.post_ids))
+
+        return post_service_pb2.BatchGetPostsResponse(
+            posts=[post_to_proto(post) for post in posts], missing_ids=missing_ids
         )
 
-    def ListPosts(self, request, context):
+    async def ListPosts(self, request, context):
         logger.info(f"Listing posts for user {request.user_id}")
-        posts, total = self.post_repository.list_posts(
-            user_id=request.user_id, page=request.page, page_size=request.page_size
-        )
+        try:
+            posts, total, next_cursor = await self.post_repository.list_posts(
+                user_id=uuid.UUID(request.user_id),
+                page=request.page,
+                page_size=request.page_size,
+                cursor=request.cursor or None,
+            )
+        # InvalidRequest: Cassandra rejected the paging state, e.g. one left
+        # over from before a schema change
+        except (ValueError, InvalidRequest) as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return post_service_pb2.ListPostsResponse()
 
-        response = post_service_pb2.ListPostsResponse(total=total)
+        response = post_service_pb2.ListPostsResponse(
+            total=total, next_cursor=next_cursor or ""
+        )
 
         for post in posts:
-            post_pb = post_service_pb2.Post(
-                id=str(post.id),
-                user_id=post.user_id,
-                title=post.title,
-                content=post.content,
-                created_at=post.created_at.isoformat(),
-                updated_at=post.updated_at.isoformat(),
-            )
+            post_pb = post_to_proto(post)
             response.posts.append(post_pb)
 
         return response
 
-    def UpdatePost(self, request, context):
+    async def ExportUserPosts(self, request, context):
+        logger.info(f"Exporting posts for user {request.user_id}")
+        fetch_size = min(request.fetch_size or EXPORT_FETCH_SIZE, MAX_EXPORT_FETCH_SIZE)
+        if fetch_size < 1:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("fetch_size must be positive")
+            return
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return
+
+        # An async generator: grpc sends each post as soon as it is yielded
+        # and stops fetching pages if the client goes away
+        async for post in self.post_repository.iter_posts_by_user(
+            user_id, fetch_size=fetch_size
+        ):
+            yield post_to_proto(post)
+
+    async def UpdatePost(self, request, context):
         logger.info(f"Updating post {request.post_id}")
-        post = self.post_repository.update_post(
-            post_id=request.post_id, title=request.title, content=request.content
-        )
+        if not request.HasField("title") and not request.HasField("content"):
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("Nothing to update")
+            return post_service_pb2.Post()
+        user_id = parse_user_id(request.user_id) if request.user_id else None
+        if request.user_id and user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.Post()
+
+        try:
+            post = await self.post_repository.update_post(
+                post_id=request.post_id,
+                title=request.title if request.HasField("title") else None,
+                content=request.content if request.HasField("content") else None,
+                user_id=user_id,
+            )
+        except PermissionError as e:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details(str(e))
+            return post_service_pb2.Post()
 
         if post is None:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details(f"Post with ID {request.post_id} not found")
             return post_service_pb2.Post()
 
-        return post_service_pb2.Post(
-            id=str(post.id),
-            user_id=post.user_id,
-            title=post.title,
-            content=post.content,
-            created_at=post.created_at.isoformat(),
-            updated_at=post.updated_at.isoformat(),
-        )
+        return post_to_proto(post)
 
-    def DeletePost(self, request, context):
+    async def DeletePost(self, request, context):
         logger.info(f"Deleting post {request.post_id} for user {request.user_id}")
-        success = self.post_repository.delete_post(
-            post_id=request.post_id, user_id=request.user_id
-        )
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.DeletePostResponse(success=False)
+
+        try:
+            success = await self.post_repository.delete_post(
+                post_id=request.post_id, user_id=user_id
+            )
+        except PermissionError as e:
+            context.set_code(grpc.StatusCode.PERMISSION_DENIED)
+            context.set_details(str(e))
+            return post_service_pb2.DeletePostResponse(success=False)
 
         if not success:
             context.set_code(grpc.StatusCode.NOT_FOUND)
@@ -109,18 +228,148 @@ class PostServiceServicer(post_service_pb2_grpc.PostServiceServicer):
 
         return post_service_pb2.DeletePostResponse(success=success)
 
+    async def GetFeed(self, request, context):
+        logger.info(f"Getting feed for user {request.user_id}")
+        page_size = min(request.page_size or FEED_PAGE_SIZE, MAX_FEED_PAGE_SIZE)
+        if page_size < 1:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("page_size must be positive")
+            return post_service_pb2.GetFeedResponse()
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.GetFeedResponse()
+
+        try:
+            pull_author_ids = await self.follow_graph.pull_author_ids(user_id)
+        except httpx.HTTPError as e:
+            # The fanned-out part of the feed doesn't need user-service
+            logger.warning(f"Serving feed of {user_id} without pulled authors: {e}")
+            pull_author_ids = []
+
+        try:
+            posts, next_cursor = await self.post_repository.get_feed(
+                user_id,
+                page_size=page_size,
+                cursor=request.cursor or None,
+                pull_author_ids=pull_author_ids,
+            )
+        except ValueError as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return post_service_pb2.GetFeedResponse()
+
+        return post_service_pb2.GetFeedResponse(
+            posts=[post_to_proto(post) for post in posts],
+            next_cursor=next_cursor or "",
+        )
+
+    async def React(self, request, context):
+        logger.info(f"User {request.user_id} reacting to post {request.post_id}")
+        reaction_type = request.reaction_type or "like"
+        if reaction_type not in REACTION_TYPES:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(
+                f"Unknown reaction_type {reaction_type!r}, expected one of {', '.join(REACTION_TYPES)}"
+            )
+            return post_service_pb2.ReactionResponse()
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.ReactionResponse()
+
+        result = await self.post_repository.react(
+            request.post_id, user_id, reaction_type
+        )
+        if result is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Post with ID {request.post_id} not found")
+            return post_service_pb2.ReactionResponse()
+
+        changed, like_count = result
+        if changed:
+            self.like_counts.mark(uuid.UUID(request.post_id))
+        return post_service_pb2.ReactionResponse(changed=changed, like_count=like_count)
+
+    async def Unreact(self, request, context):
+        logger.info(f"User {request.user_id} removing reaction to post {request.post_id}")
+        user_id = parse_user_id(request.user_id)
+        if user_id is None:
+            invalid_user_id(context, request.user_id)
+            return post_service_pb2.ReactionResponse()
+
+        result = await self.post_repository.unreact(request.post_id, user_id)
+        if result is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Post with ID {request.post_id} not found")
+            return post_service_pb2.ReactionResponse()
+
+        changed, like_count = result
+        if changed:
+            self.like_counts.mark(uuid.UUID(request.post_id))
+        return post_service_pb2.ReactionResponse(changed=changed, like_count=like_count)
+
+    async def ListReactions(self, request, context):
+        logger.info(f"Listing reactions to post {request.post_id}")
+        page_size = min(request.page_size or REACTIONS_PAGE_SIZE, MAX_REACTIONS_PAGE_SIZE)
+        if page_size < 1:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("page_size must be positive")
+            return post_service_pb2.ListReactionsResponse()
+
+        try:
+            reactions, next_cursor = await self.post_repository.list_reactions(
+                request.post_id, page_size=page_size, cursor=request.cursor or None
+            )
+        except (ValueError, InvalidRequest) as e:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+            return post_service_pb2.ListReactionsResponse()
+
+        response = post_service_pb2.ListReactionsResponse(next_cursor=next_cursor or "")
+        for reaction in reactions:
+            message = response.reactions.add(
+                user_id=reaction.user_id.bytes, reaction_type=reaction.reaction_type
+            )
+            message.created_at.FromDatetime(reaction.created_at)
+        return response
+
+
+def check_cursor_secret():
+    # With the well-known default anyone could sign their own paging cursors
+    if CURSOR_SECRET == DEFAULT_CURSOR_SECRET.encode():
+        raise RuntimeError("CURSOR_SECRET is not set; refusing to start with the default key")
+
 
-def serve():
+async def serve():
+    check_cursor_secret()
     port = os.getenv("POST_SERVICE_PORT", "50051")
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    post_service_pb2_grpc.add_PostServiceServicer_to_server(
-        PostServiceServicer(), server
+    # Handlers are coroutines waiting on Cassandra, so the number of requests
+    # in flight is no longer tied to a thread pool size
+    server = grpc.aio.server(
+        options=[
+            # Gateway keeps pooled channels alive with pings between calls
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.min_recv_ping_interval_without_data_ms", 10000),
+            ("grpc.http2.max_ping_strikes", 0),
+            ("grpc.max_send_message_length", 16 * 1024 * 1024),
+            ("grpc.max_receive_message_length", 16 * 1024 * 1024),
+        ],
     )
+    servicer = PostServiceServicer()
+    post_service_pb2_grpc.add_PostServiceServicer_to_server(servicer, server)
     server.add_insecure_port(f"[::]:{port}")
-    server.start()
+    servicer.timeline.start()
+    servicer.like_counts.start()
+    await server.start()
     logger.info(f"Post service running on port {port}")
-    server.wait_for_termination()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await servicer.timeline.stop(timeout=10)
+        await servicer.like_counts.stop()
+        await servicer.follow_graph.close()
 
 
 if __name__ == "__main__":
-    serve()
+    asyncio.run(serve())
@@ -0,0 +1,45 @@
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import PostRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def backfill_posts_by_user(repository: PostRepository):
+    copied = repository.backfill_posts_by_user()
+    logger.info(f"Copied {copied} posts into posts_by_user")
+
+
+def repair_post_counts(repository: PostRepository):
+    repaired = repository.repair_post_counts()
+    logger.info(f"Repaired {repaired} post counters")
+
+
+def migrate_user_ids(repository: PostRepository):
+    copied, skipped = repository.migrate_user_ids()
+    logger.info(f"Copied {copied} posts into the v2 tables, skipped {skipped}")
+
+
+COMMANDS = {
+    "backfill-posts-by-user": backfill_posts_by_user,
+    "repair-post-counts": repair_post_counts,
+    "migrate-user-ids": migrate_user_ids,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Post service maintenance commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+
+    COMMANDS[args.command](PostRepository())
+
+
+if __name__ == "__main__":
+    main()
@@ -44,18 +44,36 @@ class PostServiceStub(object):
             response_deserializer=post__service__pb2.Post.FromString,
             _registered_method=True,
         )
+        self.BulkCreatePosts = channel.stream_unary(
+            "/post.PostService/BulkCreatePosts",
+            request_serializer=post__service__pb2.CreatePostRequest.SerializeToString,
+            response_deserializer=post__service__pb2.BulkCreatePostsResponse.FromString,
+            _registered_method=True,
+        )
         self.GetPost = channel.unary_unary(
             "/post.PostService/GetPost",
             request_serializer=post__service__pb2.GetPostRequest.SerializeToString,
             response_deserializer=post__service__pb2.Post.FromString,
             _registered_method=True,
         )
+        self.BatchGetPosts = channel.unary_unary(
+            "/post.PostService/BatchGetPosts",
+            request_serializer=post__service__pb2.BatchGetPostsRequest.SerializeToString,
+            response_deserializer=post__service__pb2.BatchGetPostsResponse.FromString,
+            _registered_method=True,
+        )
         self.ListPosts = channel.unary_unary(
             "/post.PostService/ListPosts",
             request_serializer=post__service__pb2.ListPostsRequest.SerializeToString,
             response_deserializer=post__service__pb2.ListPostsResponse.FromString,
             _registered_method=True,
         )
+        self.ExportUserPosts = channel.unary_stream(
+            "/post.PostService/ExportUserPosts",
+            request_serializer=post__service__pb2.ExportUserPostsRequest.SerializeToString,
+            response_deserializer=post__service__pb2.Post.FromString,
+            _registered_method=True,
+        )
         self.UpdatePost = channel.unary_unary(
             "/post.PostService/UpdatePost",
             request_serializer=post__service__pb2.UpdatePostRequest.SerializeToString,
@@ -68,6 +86,30 @@ class PostServiceStub(object):
             response_deserializer=post__service__pb2.DeletePostResponse.FromString,
             _registered_method=True,
         )
+        self.GetFeed = channel.unary_unary(
+            "/post.PostService/GetFeed",
+            request_serializer=post__service__pb2.GetFeedRequest.SerializeToString,
+            response_deserializer=post__service__pb2.GetFeedResponse.FromString,
+            _registered_method=True,
+        )
+        self.React = channel.unary_unary(
+            "/post.PostService/React",
+            request_serializer=post__service__pb2.ReactRequest.SerializeToString,
+            response_deserializer=post__service__pb2.ReactionResponse.FromString,
+            _registered_method=True,
+        )
+        self.Unreact = channel.unary_unary(
+            "/post.PostService/Unreact",
+            request_serializer=post__service__pb2.UnreactRequest.SerializeToString,
+            response_deserializer=post__service__pb2.ReactionResponse.FromString,
+            _registered_method=True,
+        )
+        self.ListReactions = channel.unary_unary(
+            "/post.PostService/ListReactions",
+            request_serializer=post__service__pb2.ListReactionsRequest.SerializeToString,
+            response_deserializer=post__service__pb2.ListReactionsResponse.FromString,
+            _registered_method=True,
+        )
 
 
 class PostServiceServicer(object):
@@ -79,18 +121,36 @@ class PostServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def BulkCreatePosts(self, request_iterator, context):
+        """Creates every post sent on the stream, for imports"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def GetPost(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def BatchGetPosts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def ListPosts(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def ExportUserPosts(self, request, context):
+        """Streams all posts of a user, newest first"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
     def UpdatePost(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -103,6 +163,30 @@ class PostServiceServicer(object):
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
+    def GetFeed(self, request, context):
+        """Home timeline of a user: posts of the accounts they follow, newest first"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def React(self, request, context):
+        """One reaction per user and post; reacting again only changes its type"""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def Unreact(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
+    def ListReactions(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details("Method not implemented!")
+        raise NotImplementedError("Method not implemented!")
+
 
 def add_PostServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -111,16 +195,31 @@ def add_PostServiceServicer_to_server(servicer, server):
             request_deserializer=post__service__pb2.CreatePostRequest.FromString,
             response_serializer=post__service__pb2.Post.SerializeToString,
         ),
+        "BulkCreatePosts": grpc.stream_unary_rpc_method_handler(
+            servicer.BulkCreatePosts,
+            request_deserializer=post__service__pb2.CreatePostRequest.FromString,
+            response_serializer=post__service__pb2.BulkCreatePostsResponse.SerializeToString,
+        ),
         "GetPost": grpc.unary_unary_rpc_method_handler(
             servicer.GetPost,
             request_deserializer=post__service__pb2.GetPostRequest.FromString,
             response_serializer=post__service__pb2.Post.SerializeToString,
         ),
+        "BatchGetPosts": grpc.unary_unary_rpc_method_handler(
+            servicer.BatchGetPosts,
+            request_deserializer=post__service__pb2.BatchGetPostsRequest.FromString,
+            response_serializer=post__service__pb2.BatchGetPostsResponse.SerializeToString,
+        ),
         "ListPosts": grpc.unary_unary_rpc_method_handler(
             servicer.ListPosts,
             request_deserializer=post__service__pb2.ListPostsRequest.FromString,
             response_serializer=post__service__pb2.ListPostsResponse.SerializeToString,
         ),
+        "ExportUserPosts": grpc.unary_stream_rpc_method_handler(
+            servicer.ExportUserPosts,
+            request_deserializer=post__service__pb2.ExportUserPostsRequest.FromString,
+            response_serializer=post__service__pb2.Post.SerializeToString,
+        ),
         "UpdatePost": grpc.unary_unary_rpc_method_handler(
             servicer.UpdatePost,
             request_deserializer=post__service__pb2.UpdatePostRequest.FromString,
@@ -131,6 +230,26 @@ def add_PostServiceServicer_to_server(servicer, server):
             request_deserializer=post__service__pb2.DeletePostRequest.FromString,
             response_serializer=post__service__pb2.DeletePostResponse.SerializeToString,
         ),
+        "GetFeed": grpc.unary_unary_rpc_method_handler(
+            servicer.GetFeed,
+            request_deserializer=post__service__pb2.GetFeedRequest.FromString,
+            response_serializer=post__service__pb2.GetFeedResponse.SerializeToString,
+        ),
+        "React": grpc.unary_unary_rpc_method_handler(
+            servicer.React,
+            request_deserializer=post__service__pb2.ReactRequest.FromString,
+            response_serializer=post__service__pb2.ReactionResponse.SerializeToString,
+        ),
+        "Unreact": grpc.unary_unary_rpc_method_handler(
+            servicer.Unreact,
+            request_deserializer=post__service__pb2.UnreactRequest.FromString,
+            response_serializer=post__service__pb2.ReactionResponse.SerializeToString,
+        ),
+        "ListReactions": grpc.unary_unary_rpc_method_handler(
+            servicer.ListReactions,
+            request_deserializer=post__service__pb2.ListReactionsRequest.FromString,
+            response_serializer=post__service__pb2.ListReactionsResponse.SerializeToString,
+        ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
         "post.PostService", rpc_method_handlers
@@ -173,6 +292,36 @@ class PostService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def BulkCreatePosts(
+        request_iterator,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            "/post.PostService/BulkCreatePosts",
+            post__service__pb2.CreatePostRequest.SerializeToString,
+            post__service__pb2.BulkCreatePostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def GetPost(
         request,
@@ -203,6 +352,36 @@ class PostService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def BatchGetPosts(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/post.PostService/BatchGetPosts",
+            post__service__pb2.BatchGetPostsRequest.SerializeToString,
+            post__service__pb2.BatchGetPostsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def ListPosts(
         request,
@@ -233,6 +412,36 @@ class PostService(object):
             _registered_method=True,
         )
 
+    @staticmethod
+    def ExportUserPosts(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            "/post.PostService/ExportUserPosts",
+            post__service__pb2.ExportUserPostsRequest.SerializeToString,
+            post__service__pb2.Post.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
     @staticmethod
     def UpdatePost(
         request,
@@ -292,3 +501,123 @@ class PostService(object):
             metadata,
             _registered_method=True,
         )
+
+    @staticmethod
+    def GetFeed(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/post.PostService/GetFeed",
+            post__service__pb2.GetFeedRequest.SerializeToString,
+            post__service__pb2.GetFeedResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def React(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/post.PostService/React",
+            post__service__pb2.ReactRequest.SerializeToString,
+            post__service__pb2.ReactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def Unreact(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/post.PostService/Unreact",
+            post__service__pb2.UnreactRequest.SerializeToString,
+            post__service__pb2.ReactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
+
+    @staticmethod
+    def ListReactions(
+        request,
+        target,
+        options=(),
+        channel_credentials=None,
+        call_credentials=None,
+        insecure=False,
+        compression=None,
+        wait_for_ready=None,
+        timeout=None,
+        metadata=None,
+    ):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            "/post.PostService/ListReactions",
+            post__service__pb2.ListReactionsRequest.SerializeToString,
+            post__service__pb2.ListReactionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True,
+        )
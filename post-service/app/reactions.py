@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Optional, Set
+
+from app.database import BULK_WRITE_CONCURRENCY, PostRepository
+
+# How often reaction counts are copied into the post rows, in seconds
+LIKE_COUNT_FLUSH_INTERVAL = float(os.getenv("LIKE_COUNT_FLUSH_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCountFlusher:
+    """Keeps Post.like_count up to date in the background.
+
+    React and Unreact only update the sharded reaction counters and mark the
+    post here. Every LIKE_COUNT_FLUSH_INTERVAL seconds the marked posts get
+    their current total written into their post rows, so reads return
+    like_count with the post itself, and a post receiving thousands of
+    reactions a second is rewritten once per interval instead of each time.
+    """
+
+    def __init__(
+        self,
+        repository: PostRepository,
+        interval: float = LIKE_COUNT_FLUSH_INTERVAL,
+        concurrency: int = BULK_WRITE_CONCURRENCY,
+    ):
+        self.repository = repository
+        self.interval = interval
+        self.concurrency = concurrency
+        self._pending: Set[uuid.UUID] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def mark(self, post_id: uuid.UUID):
+        self._pending.add(post_id)
+
+    def start(self):
+        """Start flushing periodically; needs a running event loop."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write out what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing like counts failed")
+
+    async def flush(self) -> int:
+        """Write the counts of all marked posts; returns how many were written.
+
+        Posts whose write fails stay marked for the next flush.
+        """
+        post_ids, self._pending = self._pending, set()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def write(post_id):
+            async with semaphore:
+                return await self.repository.write_like_count(post_id)
+
+        post_ids = list(post_ids)
+        outcomes = await asyncio.gather(
+            *(write(post_id) for post_id in post_ids), return_exceptions=True
+        )
+        written = 0
+        for post_id, outcome in zip(post_ids, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Like count of post {post_id} not written: {outcome}")
+                self._pending.add(post_id)
+            elif outcome:
+                written += 1
+        return written
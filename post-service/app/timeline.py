@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+import httpx
+from cassandra import OperationTimedOut, RequestExecutionException
+from cassandra.cluster import NoHostAvailable
+
+from app.database import PostRepository, PostRow
+from app.follow_graph import FollowGraph
+
+# Fan-out tasks running at once, and posts waiting for one
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", "8"))
+FANOUT_QUEUE_SIZE = int(os.getenv("FANOUT_QUEUE_SIZE", "10000"))
+# Attempts per post when user-service or Cassandra fail, and the backoff
+# between them (doubling from FANOUT_RETRY_DELAY up to FANOUT_RETRY_MAX_DELAY)
+FANOUT_MAX_ATTEMPTS = int(os.getenv("FANOUT_MAX_ATTEMPTS", "5"))
+FANOUT_RETRY_DELAY = float(os.getenv("FANOUT_RETRY_DELAY", "0.5"))
+FANOUT_RETRY_MAX_DELAY = float(os.getenv("FANOUT_RETRY_MAX_DELAY", "10"))
+
+# Errors worth another attempt: user-service or Cassandra being unreachable,
+# slow or overloaded. user-service answering 5xx counts too (see is_retryable);
+# other statuses mean the request itself is wrong and fail at once.
+RETRYABLE_ERRORS = (
+    httpx.TransportError,
+    RequestExecutionException,
+    OperationTimedOut,
+    NoHostAvailable,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+class FanoutProgress:
+    """How far the fan-out of one post got, so a retry resumes from there."""
+
+    def __init__(self, post: PostRow):
+        self.post = post
+        self.author_done = False
+        self.follower_count: Optional[int] = None
+        # Cursor of the follower page to write next; None with done=False
+        # means the first page
+        self.cursor: Optional[str] = None
+        self.done = False
+        self.written = 0
+
+
+class TimelineFanout:
+    """Writes new posts into their followers' timelines in the background.
+
+    CreatePost only queues the post; a pool of worker tasks pages through
+    the author's followers and inserts the post into each timeline. The
+    author's own timeline always gets the post. Authors with
+    FANOUT_MAX_FOLLOWERS or more followers are not fanned out at all: their
+    posts are pulled into the feed at read time (see PostRepository.get_feed).
+
+    If user-service or Cassandra fail, the post is retried with backoff
+    from the follower page that failed, up to FANOUT_MAX_ATTEMPTS times; a
+    worker retrying doesn't take new posts meanwhile. If the queue is full,
+    submit waits, which slows down post creation instead of losing timeline
+    entries.
+    """
+
+    def __init__(
+        self,
+        repository: PostRepository,
+        follow_graph: FollowGraph,
+        workers: int = FANOUT_WORKERS,
+        queue_size: int = FANOUT_QUEUE_SIZE,
+        max_attempts: int = FANOUT_MAX_ATTEMPTS,
+        retry_delay: float = FANOUT_RETRY_DELAY,
+    ):
+        self.repository = repository
+        self.follow_graph = follow_graph
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.queue: "asyncio.Queue[PostRow]" = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the workers; needs a running event loop."""
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Finish the queued posts (for up to `timeout` seconds) and stop."""
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopping with {self.queue.qsize()} posts not fanned out")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, post: PostRow):
+        await self.queue.put(post)
+
+    async def _work(self):
+        while True:
+            post = await self.queue.get()
+            try:
+                await self.fan_out_with_retries(post)
+            except Exception:
+                logger.exception(f"Fan-out of post {post.id} failed")
+            finally:
+                self.queue.task_done()
+
+    async def fan_out_with_retries(self, post: PostRow) -> int:
+        """fan_out, retrying transient failures from where they happened."""
+        progress = FanoutProgress(post)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self.fan_out(post, progress)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if attempt == self.max_attempts:
+                    logger.error(
+                        f"Giving up fan-out of post {post.id} after {attempt} attempts, "
+                        f"{progress.written} timelines written: {e}"
+                    )
+                    raise
+                delay = min(self.retry_delay * 2 ** (attempt - 1), FANOUT_RETRY_MAX_DELAY)
+                logger.warning(
+                    f"Fan-out of post {post.id} failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def fan_out(self, post: PostRow, progress: Optional[FanoutProgress] = None) -> int:
+        """Insert `post` into the timelines of its author and their followers.
+
+        Steps already recorded in `progress` are skipped, and each step is
+        recorded as soon as it succeeds. Returns the number of timelines
+        written.
+        """
+        progress = progress or FanoutProgress(post)
+        if not progress.author_done:
+            progress.written += await self.repository.add_to_timelines([post.user_id], post)
+            progress.author_done = True
+
+        if progress.follower_count is None:
+            progress.follower_count = await self.follow_graph.follower_count(post.user_id)
+        if progress.follower_count >= self.follow_graph.max_followers:
+            return progress.written
+
+        while not progress.done:
+            follower_ids, next_cursor = await self.follow_graph.follower_page(
+                post.user_id, progress.cursor
+            )
+            progress.written += await self.repository.add_to_timelines(follower_ids, post)
+            progress.cursor = next_cursor
+            progress.done = next_cursor is None
+        return progress.written
@@ -0,0 +1,72 @@
+"""Bulk post creation benchmark.
+
+Reports posts/sec for one-at-a-time create_post calls and for
+create_posts at several in-flight write limits. Needs a running Cassandra
+(configured through the usual CASSANDRA_* variables); the posts it writes
+are left in place under throwaway user ids.
+
+    python -m benchmarks.bench_bulk_create --posts 5000 --users 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.database import PostRepository
+
+CONCURRENCY_SETTINGS = [1, 16, 64, 256]
+
+
+def make_items(posts: int, users: int):
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    return [
+        (user_ids[i % users], f"Post {i}", "benchmark content " * 20)
+        for i in range(posts)
+    ]
+
+
+async def run(args):
+    repository = PostRepository()
+
+    # The single-post path is much slower, so time it on a tenth of the posts
+    items = make_items(max(args.posts // 10, 1), args.users)
+    started = time.perf_counter()
+    for user_id, title, content in items:
+        await repository.create_post(user_id, title, content)
+    rate = len(items) / (time.perf_counter() - started)
+    print(f"{'mode':<24} {'posts/sec':>10}")
+    print(f"{'create_post':<24} {rate:>10.1f}")
+
+    for concurrency in CONCURRENCY_SETTINGS:
+        items = make_items(args.posts, args.users)
+        started = time.perf_counter()
+        failed = 0
+        async for post, _ in repository.create_posts(
+            stream_of(items), concurrency=concurrency
+        ):
+            failed += post is None
+        rate = len(items) / (time.perf_counter() - started)
+        label = f"create_posts x{concurrency}"
+        print(f"{label:<24} {rate:>10.1f}" + (f"  ({failed} failed)" if failed else ""))
+
+
+async def stream_of(items):
+    for item in items:
+        yield item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
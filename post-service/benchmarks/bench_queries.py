@@ -0,0 +1,94 @@
+"""Query path benchmark.
+
+Reports ops/sec for reading and writing single posts through cqlengine
+models (how PostRepository used to work) and through the prepared
+statements PostRepository uses now. Both run one request at a time, so
+the difference is the client-side cost of building queries and mapping
+rows. Needs a running Cassandra; the posts it writes are left in place.
+
+    python -m benchmarks.bench_queries --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.database import Post, PostRepository
+
+
+def ops_per_second(operation, seconds: float) -> float:
+    done = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        operation()
+        done += 1
+    return done / (time.perf_counter() - started)
+
+
+async def async_ops_per_second(operation, seconds: float) -> float:
+    done = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        await operation()
+        done += 1
+    return done / (time.perf_counter() - started)
+
+
+async def run(args):
+    repository = PostRepository()
+    user_id = uuid.uuid4()
+    post = await repository.create_post(user_id, "Benchmark", "benchmark content")
+    post_id = str(post.id)
+
+    def model_insert():
+        now = datetime.utcnow()
+        Post.create(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            title="Benchmark",
+            content="benchmark content",
+            created_at=now,
+            updated_at=now,
+        )
+
+    async def prepared_insert():
+        now = datetime.utcnow()
+        await repository._execute(
+            repository._insert_post,
+            (uuid.uuid4(), user_id, "Benchmark", "benchmark content", now, now),
+        )
+
+    results = [
+        ("get, model", ops_per_second(lambda: Post.get(id=post.id), args.seconds)),
+        (
+            "get, prepared",
+            await async_ops_per_second(
+                lambda: repository.get_post(post_id), args.seconds
+            ),
+        ),
+        ("insert, model", ops_per_second(model_insert, args.seconds)),
+        ("insert, prepared", await async_ops_per_second(prepared_insert, args.seconds)),
+    ]
+
+    print(f"{'path':<20} {'ops/sec':>10}")
+    for label, rate in results:
+        print(f"{label:<20} {rate:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from app.main import PostServiceServicer
 from app.database import PostRepository
+from app.follow_graph import FollowGraph
+from app.reactions import LikeCountFlusher
+from app.timeline import TimelineFanout
 
 
 @pytest.fixture
@@ -22,6 +25,9 @@ def post_service_servicer(mock_post_repository):
     """Фикстура для создания экземпляра PostServiceServicer с моком репозитория."""
     servicer = PostServiceServicer()
     servicer.post_repository = mock_post_repository
+    servicer.follow_graph = MagicMock(spec=FollowGraph)
+    servicer.timeline = MagicMock(spec=TimelineFanout)
+    servicer.like_counts = MagicMock(spec=LikeCountFlusher)
     return servicer
 
 
@@ -32,3 +38,14 @@ def mock_grpc_context(mocker):
     mock_context.set_code = mocker.MagicMock()
     mock_context.set_details = mocker.MagicMock()
     return mock_context
+
+
+@pytest.fixture
+def repository(mocker):
+    """Фикстура PostRepository без Cassandra: каждый prepare() возвращает свой объект."""
+    session = mocker.MagicMock()
+    session.prepare.side_effect = lambda query: mocker.MagicMock(query_string=query)
+    mocker.patch("app.database.connect_to_cassandra", return_value=session)
+    mocker.patch("app.database.sync_table")
+    mocker.patch("cassandra.cqlengine.models.DEFAULT_KEYSPACE", "post_service")
+    return PostRepository()
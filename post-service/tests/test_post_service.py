@@ -2,17 +2,36 @@ import pytest
 import uuid
 from datetime import datetime, timezone
 import grpc
+import httpx
+from cassandra import InvalidRequest
+import threading
 
 # Импортируем необходимые классы и proto
-from app.main import PostServiceServicer
+from app.main import PostServiceServicer, MAX_BATCH_GET_POSTS, EXPORT_FETCH_SIZE, check_cursor_secret
 from app.database import Post # Импортируем модель Post для создания тестовых данных
+from app.database import LegacyPost, PostByUser, PostCount
+from app import manage
+from cassandra.cqlengine.query import LWTException
+from app.database import created_at_from_id, new_post_key, encode_cursor, decode_cursor
+from app.database import PostRow, REACTION_COUNT_SHARDS, encode_feed_cursor, decode_feed_cursor
+from app.reactions import LikeCountFlusher
+from app.timeline import TimelineFanout
+from app.follow_graph import FOLLOW_LIST_MAX_LIMIT, FollowGraph
+from cassandra.util import uuid_from_time
 from app.proto import post_service_pb2
 
+
+async def stream_of(items):
+    # Асинхронный поток, как request_iterator в grpc.aio
+    for item in items:
+        yield item
+
+
 # Используем фикстуры из conftest.py
 # pytest автоматически обнаружит post_service_servicer, mock_post_repository, mock_grpc_context
 
-def test_create_post(post_service_servicer, mock_post_repository, mock_grpc_context):
-    user_id = str(uuid.uuid4())
+async def test_create_post(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
     title = "Test Title"
     content = "Test Content"
     post_id = uuid.uuid4()
@@ -31,11 +50,11 @@ def test_create_post(post_service_servicer, mock_post_repository, mock_grpc_cont
 
     # Создаем запрос
     request = post_service_pb2.CreatePostRequest(
-        user_id=user_id, title=title, content=content
+        user_id=str(user_id), title=title, content=content
     )
 
     # Вызываем метод сервиса
-    response = post_service_servicer.CreatePost(request, mock_grpc_context)
+    response = await post_service_servicer.CreatePost(request, mock_grpc_context)
 
     # Проверяем, что метод репозитория был вызван с правильными аргументами
     mock_post_repository.create_post.assert_called_once_with(
@@ -43,17 +62,20 @@ def test_create_post(post_service_servicer, mock_post_repository, mock_grpc_cont
     )
 
     # Проверяем ответ
-    assert response.id == str(post_id)
-    assert response.user_id == user_id
+    # Идентификаторы передаются как 16 байт, время - как Timestamp
+    assert response.id == post_id.bytes
+    assert response.user_id == user_id.bytes
     assert response.title == title
     assert response.content == content
-    assert response.created_at == now.isoformat()
-    assert response.updated_at == now.isoformat()
+    assert response.created_at.ToDatetime(tzinfo=timezone.utc) == now
+    assert response.updated_at.ToDatetime(tzinfo=timezone.utc) == now
     mock_grpc_context.set_code.assert_not_called() # Убедимся, что ошибки не было
+    # Пост уходит в ленты подписчиков в фоне
+    post_service_servicer.timeline.submit.assert_awaited_once_with(mock_post)
 
-def test_get_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_get_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = uuid.uuid4()
-    user_id = str(uuid.uuid4())
+    user_id = uuid.uuid4()
     now = datetime.now(timezone.utc)
     mock_post = Post(
         id=post_id,
@@ -66,19 +88,19 @@ def test_get_post_success(post_service_servicer, mock_post_repository, mock_grpc
     mock_post_repository.get_post.return_value = mock_post
 
     request = post_service_pb2.GetPostRequest(post_id=str(post_id))
-    response = post_service_servicer.GetPost(request, mock_grpc_context)
+    response = await post_service_servicer.GetPost(request, mock_grpc_context)
 
     mock_post_repository.get_post.assert_called_once_with(str(post_id))
-    assert response.id == str(post_id)
-    assert response.user_id == user_id
+    assert response.id == post_id.bytes
+    assert response.user_id == user_id.bytes
     mock_grpc_context.set_code.assert_not_called()
 
-def test_get_post_not_found(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_get_post_not_found(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = str(uuid.uuid4())
     mock_post_repository.get_post.return_value = None # Пост не найден
 
     request = post_service_pb2.GetPostRequest(post_id=post_id)
-    response = post_service_servicer.GetPost(request, mock_grpc_context)
+    response = await post_service_servicer.GetPost(request, mock_grpc_context)
 
     mock_post_repository.get_post.assert_called_once_with(post_id)
     mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.NOT_FOUND)
@@ -87,8 +109,8 @@ def test_get_post_not_found(post_service_servicer, mock_post_repository, mock_gr
     assert response == post_service_pb2.Post()
 
 
-def test_list_posts(post_service_servicer, mock_post_repository, mock_grpc_context):
-    user_id = str(uuid.uuid4())
+async def test_list_posts(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
     page = 1
     page_size = 5
     now = datetime.now(timezone.utc)
@@ -97,26 +119,94 @@ def test_list_posts(post_service_servicer, mock_post_repository, mock_grpc_conte
         for i in range(page_size)
     ]
     total_posts = 15
-    mock_post_repository.list_posts.return_value = (mock_posts, total_posts)
+    mock_post_repository.list_posts.return_value = (mock_posts, total_posts, "next")
 
     request = post_service_pb2.ListPostsRequest(
-        user_id=user_id, page=page, page_size=page_size
+        user_id=str(user_id), page=page, page_size=page_size
     )
-    response = post_service_servicer.ListPosts(request, mock_grpc_context)
+    response = await post_service_servicer.ListPosts(request, mock_grpc_context)
 
     mock_post_repository.list_posts.assert_called_once_with(
-        user_id=user_id, page=page, page_size=page_size
+        user_id=user_id, page=page, page_size=page_size, cursor=None
     )
     assert response.total == total_posts
+    assert response.next_cursor == "next"
     assert len(response.posts) == page_size
-    assert response.posts[0].id == str(mock_posts[0].id)
-    assert response.posts[0].user_id == user_id
+    assert response.posts[0].id == mock_posts[0].id.bytes
+    assert response.posts[0].user_id == user_id.bytes
     mock_grpc_context.set_code.assert_not_called()
 
 
-def test_update_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_list_posts_with_cursor(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    cursor = encode_cursor(b"paging-state")
+    mock_post_repository.list_posts.return_value = ([], 15, None)
+
+    request = post_service_pb2.ListPostsRequest(
+        user_id=str(user_id), page_size=5, cursor=cursor
+    )
+    response = await post_service_servicer.ListPosts(request, mock_grpc_context)
+
+    mock_post_repository.list_posts.assert_called_once_with(
+        user_id=user_id, page=0, page_size=5, cursor=cursor
+    )
+    # Последняя страница: курсора на следующую нет
+    assert response.next_cursor == ""
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_list_posts_invalid_cursor(post_service_servicer, repository, mock_grpc_context, mocker):
+    # Настоящий репозиторий: "garbage" - корректный base64, но не наш курсор
+    post_service_servicer.post_repository = repository
+    execute = mocker.patch.object(repository, "_execute")
+
+    request = post_service_pb2.ListPostsRequest(
+        user_id=str(uuid.uuid4()), page_size=5, cursor="garbage"
+    )
+    response = await post_service_servicer.ListPosts(request, mock_grpc_context)
+
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+    assert response == post_service_pb2.ListPostsResponse()
+    # До Cassandra такой курсор не доходит
+    execute.assert_not_called()
+
+
+async def test_list_posts_cursor_of_another_user(post_service_servicer, repository, mock_grpc_context, mocker):
+    post_service_servicer.post_repository = repository
+    mocker.patch.object(repository, "_execute")
+    cursor = encode_cursor(b"paging-state", str(uuid.uuid4()))
+
+    request = post_service_pb2.ListPostsRequest(
+        user_id=str(uuid.uuid4()), page_size=5, cursor=cursor
+    )
+    await post_service_servicer.ListPosts(request, mock_grpc_context)
+
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_list_posts_paging_state_rejected_by_cassandra(post_service_servicer, mock_post_repository, mock_grpc_context):
+    mock_post_repository.list_posts.side_effect = InvalidRequest("Invalid value for the paging state")
+
+    request = post_service_pb2.ListPostsRequest(
+        user_id=str(uuid.uuid4()), page_size=5, cursor=encode_cursor(b"stale")
+    )
+    await post_service_servicer.ListPosts(request, mock_grpc_context)
+
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+def test_cursor_roundtrip():
+    paging_state = b"\x00\x10\xff paging state"
+    assert decode_cursor(encode_cursor(paging_state, "user-1"), "user-1") == paging_state
+    assert encode_cursor(None) == ""
+    for cursor in ("не-base64", "garbage", encode_cursor(paging_state, "user-2")):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "user-1")
+
+
+async def test_update_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = uuid.uuid4()
-    user_id = str(uuid.uuid4())
+    user_id = uuid.uuid4()
     updated_title = "Updated Title"
     updated_content = "Updated Content"
     now = datetime.now(timezone.utc)
@@ -135,41 +225,80 @@ def test_update_post_success(post_service_servicer, mock_post_repository, mock_g
     request = post_service_pb2.UpdatePostRequest(
         post_id=str(post_id), title=updated_title, content=updated_content
     )
-    response = post_service_servicer.UpdatePost(request, mock_grpc_context)
+    response = await post_service_servicer.UpdatePost(request, mock_grpc_context)
 
     mock_post_repository.update_post.assert_called_once_with(
-        post_id=str(post_id), title=updated_title, content=updated_content
+        post_id=str(post_id), title=updated_title, content=updated_content, user_id=None
     )
-    assert response.id == str(post_id)
+    assert response.id == post_id.bytes
     assert response.title == updated_title
     assert response.content == updated_content
-    assert response.updated_at == updated_time.isoformat()
+    assert response.updated_at.ToDatetime(tzinfo=timezone.utc) == updated_time
     mock_grpc_context.set_code.assert_not_called()
 
-def test_update_post_not_found(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_update_post_not_found(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = str(uuid.uuid4())
     mock_post_repository.update_post.return_value = None # Пост не найден для обновления
 
     request = post_service_pb2.UpdatePostRequest(
         post_id=post_id, title="Any", content="Any"
     )
-    response = post_service_servicer.UpdatePost(request, mock_grpc_context)
+    response = await post_service_servicer.UpdatePost(request, mock_grpc_context)
 
     mock_post_repository.update_post.assert_called_once_with(
-        post_id=post_id, title="Any", content="Any"
+        post_id=post_id, title="Any", content="Any", user_id=None
     )
     mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.NOT_FOUND)
     mock_grpc_context.set_details.assert_called_once()
     assert response == post_service_pb2.Post()
 
 
-def test_delete_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_update_post_not_author(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    mock_post_repository.update_post.side_effect = PermissionError("Post belongs to another user")
+
+    request = post_service_pb2.UpdatePostRequest(
+        post_id=str(uuid.uuid4()), title="Any", content="Any", user_id=str(user_id)
+    )
+    response = await post_service_servicer.UpdatePost(request, mock_grpc_context)
+
+    assert mock_post_repository.update_post.call_args.kwargs["user_id"] == user_id
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.PERMISSION_DENIED)
+    assert response == post_service_pb2.Post()
+
+
+async def test_update_post_partial(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = str(uuid.uuid4())
-    user_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    mock_post_repository.update_post.return_value = Post(
+        id=uuid.UUID(post_id), user_id=uuid.uuid4(), title="Old", content="", created_at=now, updated_at=now
+    )
+
+    # Пустая строка - это новое значение, а не отсутствие поля
+    request = post_service_pb2.UpdatePostRequest(post_id=post_id, content="")
+    await post_service_servicer.UpdatePost(request, mock_grpc_context)
+
+    mock_post_repository.update_post.assert_called_once_with(
+        post_id=post_id, title=None, content="", user_id=None
+    )
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_update_post_nothing_to_update(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.UpdatePostRequest(post_id=str(uuid.uuid4()))
+    await post_service_servicer.UpdatePost(request, mock_grpc_context)
+
+    mock_post_repository.update_post.assert_not_called()
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_delete_post_success(post_service_servicer, mock_post_repository, mock_grpc_context):
+    post_id = str(uuid.uuid4())
+    user_id = uuid.uuid4()
     mock_post_repository.delete_post.return_value = True # Успешное удаление
 
-    request = post_service_pb2.DeletePostRequest(post_id=post_id, user_id=user_id)
-    response = post_service_servicer.DeletePost(request, mock_grpc_context)
+    request = post_service_pb2.DeletePostRequest(post_id=post_id, user_id=str(user_id))
+    response = await post_service_servicer.DeletePost(request, mock_grpc_context)
 
     mock_post_repository.delete_post.assert_called_once_with(
         post_id=post_id, user_id=user_id
@@ -177,13 +306,13 @@ def test_delete_post_success(post_service_servicer, mock_post_repository, mock_g
     assert response.success is True
     mock_grpc_context.set_code.assert_not_called()
 
-def test_delete_post_not_found_or_unauthorized(post_service_servicer, mock_post_repository, mock_grpc_context):
+async def test_delete_post_not_found_or_unauthorized(post_service_servicer, mock_post_repository, mock_grpc_context):
     post_id = str(uuid.uuid4())
-    user_id = str(uuid.uuid4())
+    user_id = uuid.uuid4()
     mock_post_repository.delete_post.return_value = False # Неудачное удаление (не найден или не авторизован)
 
-    request = post_service_pb2.DeletePostRequest(post_id=post_id, user_id=user_id)
-    response = post_service_servicer.DeletePost(request, mock_grpc_context)
+    request = post_service_pb2.DeletePostRequest(post_id=post_id, user_id=str(user_id))
+    response = await post_service_servicer.DeletePost(request, mock_grpc_context)
 
     mock_post_repository.delete_post.assert_called_once_with(
         post_id=post_id, user_id=user_id
@@ -191,3 +320,819 @@ def test_delete_post_not_found_or_unauthorized(post_service_servicer, mock_post_
     assert response.success is False
     mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.NOT_FOUND)
     mock_grpc_context.set_details.assert_called_once()
+
+
+async def test_delete_post_invalid_user_id(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.DeletePostRequest(post_id=str(uuid.uuid4()), user_id="user-1")
+    await post_service_servicer.DeletePost(request, mock_grpc_context)
+
+    mock_post_repository.delete_post.assert_not_called()
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_batch_get_posts(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    found = [
+        Post(id=uuid.uuid4(), user_id=user_id, title=f"Post {i}", content="Content", created_at=now, updated_at=now)
+        for i in range(2)
+    ]
+    missing_id = str(uuid.uuid4())
+    mock_post_repository.get_posts.return_value = (found, [missing_id])
+
+    post_ids = [str(found[0].id), missing_id, str(found[1].id)]
+    request = post_service_pb2.BatchGetPostsRequest(post_ids=post_ids)
+    response = await post_service_servicer.BatchGetPosts(request, mock_grpc_context)
+
+    mock_post_repository.get_posts.assert_called_once_with(post_ids)
+    assert [p.id for p in response.posts] == [p.id.bytes for p in found]
+    assert list(response.missing_ids) == [missing_id]
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_batch_get_posts_too_many(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.BatchGetPostsRequest(
+        post_ids=[str(uuid.uuid4()) for _ in range(MAX_BATCH_GET_POSTS + 1)]
+    )
+    await post_service_servicer.BatchGetPosts(request, mock_grpc_context)
+
+    mock_post_repository.get_posts.assert_not_called()
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_export_user_posts_streams(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    posts = [
+        Post(id=uuid.uuid4(), user_id=user_id, title=f"Post {i}", content="Content", created_at=now, updated_at=now)
+        for i in range(3)
+    ]
+    mock_post_repository.iter_posts_by_user.return_value = stream_of(posts)
+
+    request = post_service_pb2.ExportUserPostsRequest(user_id=str(user_id))
+    stream = post_service_servicer.ExportUserPosts(request, mock_grpc_context)
+
+    # Посты отдаются по одному, без чтения всего списка заранее
+    assert (await anext(stream)).id == posts[0].id.bytes
+    assert [p.id async for p in stream] == [p.id.bytes for p in posts[1:]]
+    mock_post_repository.iter_posts_by_user.assert_called_once_with(
+        user_id, fetch_size=EXPORT_FETCH_SIZE
+    )
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_export_user_posts_invalid_fetch_size(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.ExportUserPostsRequest(user_id=str(uuid.uuid4()), fetch_size=-1)
+
+    assert [p async for p in post_service_servicer.ExportUserPosts(request, mock_grpc_context)] == []
+    mock_post_repository.iter_posts_by_user.assert_not_called()
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_bulk_create_posts(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    created = Post(id=uuid.uuid4(), user_id=user_id, title="Post", content="Content", created_at=now, updated_at=now)
+
+    async def create_posts(items):
+        # Репозиторий получает поток кортежей (user_id, title, content);
+        # некорректный user_id приходит как None
+        assert [item async for item in items] == [(user_id, "Post", "Content"), (None, "Post", "Content")]
+        yield created, None
+        yield None, "a valid user_id and a title are required"
+
+    mock_post_repository.create_posts.side_effect = create_posts
+
+    requests = stream_of([
+        post_service_pb2.CreatePostRequest(user_id=str(user_id), title="Post", content="Content"),
+        post_service_pb2.CreatePostRequest(user_id="user-1", title="Post", content="Content"),
+    ])
+    response = await post_service_servicer.BulkCreatePosts(requests, mock_grpc_context)
+
+    assert response.created == 1
+    assert response.failed == 1
+    assert response.results[0].index == 0
+    assert response.results[0].post_id == str(created.id)
+    assert response.results[1].index == 1
+    assert response.results[1].error == "a valid user_id and a title are required"
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_repository_create_posts_reports_failed_writes(repository, mocker):
+    change_count = mocker.patch.object(repository, "_change_post_count")
+
+    # Каждому посту соответствуют две вставки; у второго поста одна из них падает
+    async def execute(statement, parameters=None, paging_state=None):
+        if statement is repository._insert_post_by_user and parameters[3] == "Second":
+            raise Exception("timeout")
+
+    execute_mock = mocker.patch.object(repository, "_execute", side_effect=execute)
+
+    items = stream_of([("user-1", "First", "Content"), ("user-1", "", "Content"), ("user-1", "Second", "Content")])
+    results = [result async for result in repository.create_posts(items, concurrency=8)]
+
+    assert results[0][0].title == "First" and results[0][1] is None
+    assert results[1] == (None, "a valid user_id and a title are required")
+    assert results[2] == (None, "timeout")
+    # Строка второго поста, которая всё же записалась, удаляется
+    assert execute_mock.await_count == 5
+    second_id = execute_mock.await_args_list[2].args[1][0]
+    assert execute_mock.await_args_list[4].args == (repository._delete_post, (second_id, "user-1"))
+    change_count.assert_awaited_once_with("user-1", 1)
+
+
+async def test_repository_create_posts_counts_leftover_listing_row(repository, mocker):
+    change_count = mocker.patch.object(repository, "_change_post_count")
+
+    # Запись в posts падает, строка в posts_by_user остаётся и не удаляется
+    async def execute(statement, parameters=None, paging_state=None):
+        if statement in (repository._insert_post, repository._delete_post_by_user):
+            raise Exception("timeout")
+
+    execute_mock = mocker.patch.object(repository, "_execute", side_effect=execute)
+
+    items = stream_of([("user-1", "First", "Content")])
+    results = [result async for result in repository.create_posts(items)]
+
+    assert results == [(None, "timeout")]
+    post_id = execute_mock.await_args_list[0].args[1][0]
+    created_at = execute_mock.await_args_list[1].args[1][1]
+    assert execute_mock.await_args_list[2].args == (
+        repository._delete_post_by_user, ("user-1", created_at, post_id)
+    )
+    # Счётчик совпадает со списком постов пользователя
+    change_count.assert_awaited_once_with("user-1", 1)
+
+
+async def test_repository_execute_awaits_driver_future(repository):
+    result = object()
+
+    class ResponseFuture:
+        # Драйвер вызывает колбэки из своего потока ввода-вывода
+        def add_callbacks(self, callback, errback):
+            threading.Thread(target=callback, args=([],)).start()
+
+        def result(self):
+            return result
+
+    repository.session.execute_async.return_value = ResponseFuture()
+
+    assert await repository._execute("SELECT 1") is result
+
+
+async def test_repository_fetch_page_uses_prepared_statement(repository, mocker):
+    rows = [object(), object()]
+    result = mocker.MagicMock(current_rows=rows, paging_state=b"next")
+    execute = mocker.patch.object(repository, "_execute", return_value=result)
+
+    posts, paging_state = await repository._fetch_page("user-1", 2, b"state")
+
+    # Строки драйвера возвращаются как есть, без построения моделей cqlengine
+    assert posts is rows
+    assert paging_state == b"next"
+    repository._select_posts_by_user.bind.assert_called_once_with(("user-1",))
+    statement = execute.await_args.args[0]
+    assert statement is repository._select_posts_by_user.bind.return_value
+    assert statement.fetch_size == 2
+    assert execute.await_args.kwargs["paging_state"] == b"state"
+
+
+def lwt_result(mocker, applied, user_id=None):
+    result = mocker.MagicMock(was_applied=applied)
+    result.one.return_value = mocker.MagicMock(user_id=user_id)
+    return result
+
+
+def test_new_post_key_encodes_created_at():
+    post_id, created_at = new_post_key()
+
+    assert created_at_from_id(post_id) == created_at
+    assert created_at_from_id(uuid.uuid4()) is None
+
+
+async def test_repository_update_post_single_round_trip(repository, mocker):
+    post_id, created_at = new_post_key()
+    execute = mocker.patch.object(
+        repository, "_execute", return_value=lwt_result(mocker, True)
+    )
+
+    post = await repository.update_post(str(post_id), title="New", content="Content", user_id="user-1")
+
+    # Ключ строки posts_by_user берётся из id поста, без предварительного чтения
+    statements = [call.args[0] for call in execute.await_args_list]
+    assert statements == [
+        repository._update_post[("title", "content")],
+        repository._update_post_by_user[("title", "content")],
+    ]
+    assert execute.await_args_list[1].args[1][3:] == ("user-1", created_at, post_id)
+    assert post.title == "New"
+    assert post.created_at == created_at
+
+
+async def test_repository_update_post_not_found(repository, mocker):
+    post_id, _ = new_post_key()
+    mocker.patch.object(repository, "_execute", return_value=lwt_result(mocker, False))
+
+    assert await repository.update_post(str(post_id), title="New", user_id="user-1") is None
+
+
+async def test_repository_update_post_writes_only_changed_fields(repository, mocker):
+    post_id, created_at = new_post_key()
+    current = mocker.MagicMock(title="Old title", content="Long content")
+    mocker.patch.object(repository, "get_post", return_value=current)
+    execute = mocker.patch.object(
+        repository, "_execute", return_value=lwt_result(mocker, True)
+    )
+
+    post = await repository.update_post(str(post_id), title="New", user_id="user-1")
+
+    # Пишется только title (и updated_at), content не передаётся заново
+    assert [call.args[0] for call in execute.await_args_list] == [
+        repository._update_post[("title",)],
+        repository._update_post_by_user[("title",)],
+    ]
+    assert execute.await_args_list[0].args[1][0] == "New"
+    assert len(execute.await_args_list[0].args[1]) == 4
+    assert post.title == "New"
+    assert post.content == "Long content"
+
+
+async def test_repository_update_post_nothing_to_update(repository):
+    with pytest.raises(ValueError):
+        await repository.update_post(str(uuid.uuid4()), user_id="user-1")
+
+
+async def test_repository_delete_post_not_author(repository, mocker):
+    post_id, _ = new_post_key()
+    change_count = mocker.patch.object(repository, "_change_post_count")
+    mocker.patch.object(
+        repository, "_execute", return_value=lwt_result(mocker, False, user_id="user-2")
+    )
+
+    with pytest.raises(PermissionError):
+        await repository.delete_post(str(post_id), "user-1")
+    change_count.assert_not_called()
+
+
+async def test_repository_delete_legacy_post_reads_key(repository, mocker):
+    post_id = uuid.uuid4()
+    created_at = datetime(2023, 1, 1)
+    change_count = mocker.patch.object(repository, "_change_post_count")
+    key_result = mocker.MagicMock()
+    key_result.one.return_value = mocker.MagicMock(user_id="user-1", created_at=created_at)
+    execute = mocker.patch.object(
+        repository,
+        "_execute",
+        side_effect=[key_result, lwt_result(mocker, True), lwt_result(mocker, True)],
+    )
+
+    assert await repository.delete_post(str(post_id), "user-1") is True
+    assert execute.await_args_list[0].args[0] is repository._select_post_key
+    assert execute.await_args_list[2].args[1] == ("user-1", created_at, post_id)
+    change_count.assert_awaited_once_with("user-1", -1)
+
+
+async def test_get_feed(post_service_servicer, mock_post_repository, mock_grpc_context):
+    user_id = uuid.uuid4()
+    author_id = uuid.uuid4()
+    post_id, now = new_post_key()
+    post = PostRow(post_id, author_id, "Title", "Content", now, now)
+    post_service_servicer.follow_graph.pull_author_ids.return_value = [author_id]
+    mock_post_repository.get_feed.return_value = ([post], "next")
+
+    request = post_service_pb2.GetFeedRequest(user_id=str(user_id), page_size=5, cursor="abc")
+    response = await post_service_servicer.GetFeed(request, mock_grpc_context)
+
+    mock_post_repository.get_feed.assert_awaited_once_with(
+        user_id, page_size=5, cursor="abc", pull_author_ids=[author_id]
+    )
+    assert [p.id for p in response.posts] == [post_id.bytes]
+    assert response.next_cursor == "next"
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_get_feed_without_user_service(post_service_servicer, mock_post_repository, mock_grpc_context):
+    # Без user-service лента отдаётся из разложенных записей, без pull-авторов
+    post_service_servicer.follow_graph.pull_author_ids.side_effect = httpx.ConnectError("refused")
+    mock_post_repository.get_feed.return_value = ([], None)
+
+    request = post_service_pb2.GetFeedRequest(user_id=str(uuid.uuid4()))
+    response = await post_service_servicer.GetFeed(request, mock_grpc_context)
+
+    assert mock_post_repository.get_feed.await_args.kwargs["pull_author_ids"] == []
+    assert mock_post_repository.get_feed.await_args.kwargs["page_size"] == 20
+    assert response.next_cursor == ""
+    mock_grpc_context.set_code.assert_not_called()
+
+
+def test_feed_cursor_roundtrip():
+    post_id, created_at = new_post_key()
+
+    assert decode_feed_cursor(encode_feed_cursor(created_at, post_id)) == (created_at, post_id)
+    with pytest.raises(ValueError):
+        decode_feed_cursor("not-a-cursor")
+
+
+async def test_repository_get_feed_merges_pulled_authors(repository, mocker):
+    user_id, star_id = uuid.uuid4(), uuid.uuid4()
+    # Ключи от старых к новым: (id, created_at)
+    times = [datetime(2026, 1, 1, 0, 0, second) for second in range(4)]
+    keys = [(uuid_from_time(t), t) for t in times]
+    # Лента хранит только ключи, посты популярного автора читаются напрямую
+    timeline = [mocker.MagicMock(created_at=created_at, post_id=post_id) for post_id, created_at in keys[::2]]
+    pulled = [PostRow(post_id, star_id, "Star", "", created_at, created_at) for post_id, created_at in keys[1::2]]
+    fanned_out = [PostRow(post_id, uuid.uuid4(), "Fanned", "", created_at, created_at) for post_id, created_at in keys[::2]]
+
+    async def execute(statement, parameters=None, paging_state=None):
+        if statement is repository._select_timeline:
+            return timeline
+        return mocker.MagicMock(current_rows=pulled)
+
+    mocker.patch.object(repository, "_execute", side_effect=execute)
+    get_posts = mocker.patch.object(repository, "get_posts", return_value=(fanned_out[1:], []))
+
+    posts, next_cursor = await repository.get_feed(user_id, page_size=3, pull_author_ids=[star_id])
+
+    # Берутся три самых новых поста, самый старый (из ленты) не читается
+    get_posts.assert_awaited_once_with([str(keys[2][0])])
+    assert [p.id for p in posts] == [keys[3][0], keys[2][0], keys[1][0]]
+    assert decode_feed_cursor(next_cursor) == (keys[1][1], keys[1][0])
+
+
+def fake_follow_graph(mocker, pages, follower_count=2, max_followers=3):
+    # Страницы подписчиков по курсорам "0", "1", ...; последняя без курсора
+    follow_graph = mocker.MagicMock(max_followers=max_followers)
+    follow_graph.follower_count = mocker.AsyncMock(return_value=follower_count)
+
+    async def follower_page(user_id, cursor=None):
+        index = int(cursor or 0)
+        next_cursor = str(index + 1) if index + 1 < len(pages) else None
+        return pages[index], next_cursor
+
+    follow_graph.follower_page = mocker.AsyncMock(side_effect=follower_page)
+    return follow_graph
+
+
+async def test_timeline_fanout_skips_big_accounts(mocker):
+    repository = mocker.MagicMock()
+    repository.add_to_timelines = mocker.AsyncMock(side_effect=lambda ids, post: len(ids))
+    followers = [[uuid.uuid4(), uuid.uuid4()], [uuid.uuid4()]]
+    follow_graph = fake_follow_graph(mocker, followers, follower_count=3)
+    fanout = TimelineFanout(repository, follow_graph, workers=2)
+    post_id, now = new_post_key()
+    post = PostRow(post_id, uuid.uuid4(), "Title", "Content", now, now)
+
+    assert await fanout.fan_out(post) == 1  # Только лента автора
+
+    follow_graph.follower_count.return_value = 2
+    fanout.start()
+    await fanout.submit(post)
+    await fanout.stop(timeout=1)
+    written_to = [call.args[0] for call in repository.add_to_timelines.await_args_list[1:]]
+    assert written_to == [[post.user_id]] + followers
+
+
+async def test_timeline_fanout_resumes_after_failure(mocker):
+    repository = mocker.MagicMock()
+    repository.add_to_timelines = mocker.AsyncMock(side_effect=lambda ids, post: len(ids))
+    followers = [[uuid.uuid4()], [uuid.uuid4()], [uuid.uuid4()]]
+    follow_graph = fake_follow_graph(mocker, followers)
+    page = follow_graph.follower_page.side_effect
+    failures = [httpx.ConnectTimeout("timeout")]
+
+    # Вторая страница подписчиков один раз не читается
+    async def flaky_page(user_id, cursor=None):
+        if cursor == "1" and failures:
+            raise failures.pop()
+        return await page(user_id, cursor)
+
+    follow_graph.follower_page.side_effect = flaky_page
+    fanout = TimelineFanout(repository, follow_graph, retry_delay=0)
+    post_id, now = new_post_key()
+    post = PostRow(post_id, uuid.uuid4(), "Title", "Content", now, now)
+
+    assert await fanout.fan_out_with_retries(post) == 4
+
+    # Повтор продолжает со страницы, на которой упал: никто не получил пост дважды
+    written_to = [call.args[0] for call in repository.add_to_timelines.await_args_list]
+    assert written_to == [[post.user_id]] + followers
+    assert follow_graph.follower_count.await_count == 1
+
+
+async def test_timeline_fanout_gives_up_after_max_attempts(mocker):
+    repository = mocker.MagicMock()
+    repository.add_to_timelines = mocker.AsyncMock(side_effect=lambda ids, post: len(ids))
+    follow_graph = fake_follow_graph(mocker, [[uuid.uuid4()]])
+    follow_graph.follower_count.side_effect = httpx.ConnectError("refused")
+    fanout = TimelineFanout(repository, follow_graph, max_attempts=3, retry_delay=0)
+    post_id, now = new_post_key()
+    post = PostRow(post_id, uuid.uuid4(), "Title", "Content", now, now)
+
+    with pytest.raises(httpx.ConnectError):
+        await fanout.fan_out_with_retries(post)
+    assert follow_graph.follower_count.await_count == 3
+    # Лента автора записана один раз, а не на каждой попытке
+    assert repository.add_to_timelines.await_count == 1
+
+
+async def test_timeline_fanout_retries_only_server_errors(mocker):
+    repository = mocker.MagicMock()
+    repository.add_to_timelines = mocker.AsyncMock(side_effect=lambda ids, post: len(ids))
+    follow_graph = fake_follow_graph(mocker, [[uuid.uuid4()]])
+    fanout = TimelineFanout(repository, follow_graph, max_attempts=3, retry_delay=0)
+    post_id, now = new_post_key()
+    post = PostRow(post_id, uuid.uuid4(), "Title", "Content", now, now)
+
+    def status_error(status_code):
+        request = httpx.Request("GET", "http://user-service/users")
+        response = httpx.Response(status_code, request=request)
+        return httpx.HTTPStatusError("error", request=request, response=response)
+
+    # 4xx означает ошибку в самом запросе: повторять бессмысленно
+    follow_graph.follower_count.side_effect = status_error(422)
+    with pytest.raises(httpx.HTTPStatusError):
+        await fanout.fan_out_with_retries(post)
+    assert follow_graph.follower_count.await_count == 1
+
+    # 5xx повторяется, как недоступность сервиса
+    follow_graph.follower_count.reset_mock()
+    follow_graph.follower_count.side_effect = [status_error(503), 1]
+    assert await fanout.fan_out_with_retries(post) == 2
+    assert follow_graph.follower_count.await_count == 2
+
+
+async def test_follow_graph_caps_page_size():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"users": [], "next_cursor": None})
+
+    client = httpx.AsyncClient(base_url="http://user-service", transport=httpx.MockTransport(handler))
+    follow_graph = FollowGraph(client=client)
+
+    # Больше FOLLOW_LIST_MAX_LIMIT user-service не отдаёт, отвечая 422
+    assert await follow_graph.follower_page(uuid.uuid4(), page_size=FOLLOW_LIST_MAX_LIMIT + 1) == ([], None)
+    assert requests[0].url.params["limit"] == str(FOLLOW_LIST_MAX_LIMIT)
+    await follow_graph.close()
+
+
+async def test_repository_add_to_timelines_raises_after_all_writes(repository, mocker):
+    post_id, now = new_post_key()
+    post = PostRow(post_id, uuid.uuid4(), "Title", "Content", now, now)
+    user_ids = [uuid.uuid4() for _ in range(3)]
+
+    async def execute(statement, parameters=None, paging_state=None):
+        if parameters[0] == user_ids[1]:
+            raise Exception("timeout")
+
+    execute_mock = mocker.patch.object(repository, "_execute", side_effect=execute)
+
+    # Ошибка поднимается, чтобы fan-out повторил страницу, но только после всех вставок
+    with pytest.raises(Exception, match="timeout"):
+        await repository.add_to_timelines(user_ids, post)
+    assert execute_mock.await_count == 3
+
+
+async def test_react(post_service_servicer, mock_post_repository, mock_grpc_context):
+    post_id, user_id = uuid.uuid4(), uuid.uuid4()
+    mock_post_repository.react.return_value = (True, 7)
+
+    request = post_service_pb2.ReactRequest(post_id=str(post_id), user_id=str(user_id))
+    response = await post_service_servicer.React(request, mock_grpc_context)
+
+    # Пустой тип реакции - это like; like_count поста обновится в фоне
+    mock_post_repository.react.assert_awaited_once_with(str(post_id), user_id, "like")
+    post_service_servicer.like_counts.mark.assert_called_once_with(post_id)
+    assert (response.changed, response.like_count) == (True, 7)
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_react_invalid_type_or_missing_post(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.ReactRequest(
+        post_id=str(uuid.uuid4()), user_id=str(uuid.uuid4()), reaction_type="meh"
+    )
+    await post_service_servicer.React(request, mock_grpc_context)
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+    mock_post_repository.react.assert_not_called()
+
+    mock_grpc_context.reset_mock()
+    mock_post_repository.react.return_value = None
+    request.reaction_type = "wow"
+    await post_service_servicer.React(request, mock_grpc_context)
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.NOT_FOUND)
+    post_service_servicer.like_counts.mark.assert_not_called()
+
+
+async def test_repository_react_is_idempotent(repository, mocker):
+    post_id, user_id = uuid.uuid4(), uuid.uuid4()
+    mocker.patch.object(repository, "_post_key", return_value=(uuid.uuid4(), datetime(2023, 1, 1)))
+    mocker.patch.object(repository, "count_likes", return_value=1)
+    existing = mocker.MagicMock(was_applied=False)
+    existing.one.return_value = mocker.MagicMock(reaction_type="like")
+    execute = mocker.patch.object(
+        repository, "_execute", side_effect=[lwt_result(mocker, True), None, existing]
+    )
+
+    assert await repository.react(str(post_id), user_id, "like") == (True, 1)
+    # Счётчик увеличивается в шарде пользователя, а не в одной общей ячейке
+    assert execute.await_args_list[1].args == (
+        repository._update_reaction_count, (1, post_id, user_id.int % REACTION_COUNT_SHARDS)
+    )
+
+    # Повторная реакция того же типа ничего не пишет
+    assert await repository.react(str(post_id), user_id, "like") == (False, 1)
+    assert execute.await_count == 3
+
+
+async def test_repository_write_like_count(repository, mocker):
+    post_id, created_at = new_post_key()
+    author_id = uuid.uuid4()
+    mocker.patch.object(repository, "_post_key", return_value=(author_id, created_at))
+    counts = [mocker.MagicMock(reactions=n) for n in (3, 0, 4)]
+    execute = mocker.patch.object(repository, "_execute", side_effect=[counts, None, None])
+
+    assert await repository.write_like_count(post_id) is True
+
+    # Пишется сумма шардов, в обе таблицы постов
+    assert execute.await_args_list[1].args == (repository._update_like_count, (7, post_id))
+    assert execute.await_args_list[2].args == (
+        repository._update_like_count_by_user, (7, author_id, created_at, post_id)
+    )
+
+
+async def test_like_count_flusher_retries_failed_writes(mocker):
+    repository = mocker.MagicMock()
+    ok_id, failing_id = uuid.uuid4(), uuid.uuid4()
+
+    async def write_like_count(post_id):
+        if post_id == failing_id:
+            raise Exception("timeout")
+        return True
+
+    repository.write_like_count = mocker.AsyncMock(side_effect=write_like_count)
+    flusher = LikeCountFlusher(repository, interval=60)
+    flusher.mark(ok_id)
+    flusher.mark(ok_id)
+    flusher.mark(failing_id)
+
+    assert await flusher.flush() == 1
+    assert repository.write_like_count.await_count == 2
+    # Неудачная запись остаётся до следующего сброса
+    repository.write_like_count.side_effect = None
+    repository.write_like_count.return_value = True
+    assert await flusher.flush() == 1
+    repository.write_like_count.assert_awaited_with(failing_id)
+
+
+async def test_repository_create_post_writes_both_tables(repository, mocker):
+    batch_class = mocker.patch("app.database.BatchStatement")
+    execute = mocker.patch.object(repository, "_execute")
+    change_count = mocker.patch.object(repository, "_change_post_count")
+    user_id = uuid.uuid4()
+
+    post = await repository.create_post(user_id, "Title", "Content")
+
+    # Обе таблицы пишутся одним logged batch
+    batch = batch_class.return_value
+    execute.assert_awaited_once_with(batch)
+    assert [call.args for call in batch.add.call_args_list] == [
+        (repository._insert_post, (post.id, user_id, "Title", "Content", post.created_at, post.updated_at)),
+        (repository._insert_post_by_user, (user_id, post.created_at, post.id, "Title", "Content", post.updated_at)),
+    ]
+    change_count.assert_awaited_once_with(user_id, 1)
+
+
+def test_repository_backfill_posts_by_user_skips_existing_rows(repository, mocker):
+    now = datetime(2023, 1, 1)
+    posts = [
+        Post(id=uuid.uuid4(), user_id=uuid.uuid4(), title=f"Post {i}", content="", created_at=now, updated_at=now)
+        for i in range(3)
+    ]
+    objects = mocker.patch.object(Post, "objects")
+    objects.all.return_value.fetch_size.return_value = iter(posts)
+    saved = []
+
+    def save(row):
+        # Вторая строка уже есть в posts_by_user
+        if row.id == posts[1].id:
+            raise LWTException({"[applied]": False})
+        saved.append(row)
+
+    mocker.patch.object(PostByUser, "save", autospec=True, side_effect=save)
+
+    assert repository.backfill_posts_by_user() == 2
+
+    objects.all.return_value.fetch_size.assert_called_once_with(500)
+    assert [row.id for row in saved] == [posts[0].id, posts[2].id]
+    assert all(row._if_not_exists for row in saved)
+    assert saved[0].user_id == posts[0].user_id
+    assert saved[0].created_at == now
+
+
+async def test_repository_post_counter_follows_create_and_delete(repository, mocker):
+    user_id = uuid.uuid4()
+    mocker.patch("app.database.BatchStatement")
+    execute = mocker.patch.object(repository, "_execute", return_value=lwt_result(mocker, True))
+
+    post = await repository.create_post(user_id, "Title", "Content")
+    await repository.delete_post(str(post.id), user_id)
+
+    # Счётчик постов автора: +1 при создании и -1 при удалении
+    counter_updates = [
+        call.args[1] for call in execute.await_args_list if call.args[0] is repository._update_count
+    ]
+    assert counter_updates == [(1, user_id), (-1, user_id)]
+
+
+async def test_repository_count_posts(repository, mocker):
+    result = mocker.MagicMock()
+    result.one.return_value = mocker.MagicMock(post_count=5)
+    execute = mocker.patch.object(repository, "_execute", return_value=result)
+    user_id = uuid.uuid4()
+
+    assert await repository.count_posts(user_id) == 5
+    execute.assert_awaited_once_with(repository._select_count, (user_id,))
+
+    # Нет строки счётчика - у автора нет постов
+    result.one.return_value = None
+    assert await repository.count_posts(user_id) == 0
+
+
+def test_repository_repair_post_counts(repository, mocker):
+    correct, drifted, missing, stale = (uuid.uuid4() for _ in range(4))
+    rows = [mocker.MagicMock(user_id=user_id) for user_id in [correct, drifted, drifted, drifted, missing]]
+    counters = [
+        mocker.MagicMock(user_id=correct, post_count=1),
+        mocker.MagicMock(user_id=drifted, post_count=5),
+        mocker.MagicMock(user_id=stale, post_count=2),
+    ]
+    mocker.patch.object(PostByUser, "objects").all.return_value.fetch_size.return_value = rows
+    mocker.patch.object(PostCount, "objects").all.return_value.fetch_size.return_value = counters
+
+    assert repository.repair_post_counts() == 3
+
+    # Исправляются только разошедшиеся счётчики, на разницу с реальным числом постов
+    updates = {
+        call.args[1][1]: call.args[1][0]
+        for call in repository.session.execute.call_args_list
+        if call.args[0] is repository._update_count
+    }
+    assert updates == {drifted: -2, missing: 1, stale: -2}
+
+
+def test_manage_repair_post_counts_command(mocker):
+    repository_class = mocker.patch("app.manage.PostRepository")
+    repository_class.return_value.repair_post_counts.return_value = 3
+
+    manage.main(["repair-post-counts"])
+
+    repository_class.return_value.repair_post_counts.assert_called_once_with()
+
+
+def test_repository_migrate_user_ids(repository, mocker):
+    now = datetime(2023, 1, 1)
+    user_id = uuid.uuid4()
+    legacy = [
+        LegacyPost(id=uuid.uuid4(), user_id=str(user_id), title="Old", content="Text", created_at=now, updated_at=now),
+        LegacyPost(id=uuid.uuid4(), user_id="not-a-uuid", title="Broken", content="", created_at=now, updated_at=now),
+    ]
+    mocker.patch.object(LegacyPost, "objects").all.return_value.fetch_size.side_effect = lambda size: iter(legacy)
+    repair = mocker.patch.object(repository, "repair_post_counts")
+    stored = {}
+
+    def save(row):
+        # Как IF NOT EXISTS в Cassandra: повторная вставка не применяется
+        key = (type(row).__name__, row.id)
+        if key in stored:
+            raise LWTException({"[applied]": False})
+        stored[key] = row
+
+    mocker.patch.object(Post, "save", autospec=True, side_effect=save)
+    mocker.patch.object(PostByUser, "save", autospec=True, side_effect=save)
+
+    assert repository.migrate_user_ids() == (1, 1)
+
+    # Текстовый user_id становится UUID в обеих таблицах, остальные поля те же
+    post = stored[("Post", legacy[0].id)]
+    by_user = stored[("PostByUser", legacy[0].id)]
+    assert post.user_id == by_user.user_id == user_id
+    assert (post.title, post.content, post.created_at) == ("Old", "Text", now)
+    assert len(stored) == 2
+
+    # Повторный запуск ничего не перезаписывает, счётчики пересчитываются снова
+    stored[("Post", legacy[0].id)].title = "Edited after the switch"
+    assert repository.migrate_user_ids() == (0, 1)
+    assert stored[("Post", legacy[0].id)].title == "Edited after the switch"
+    assert repair.call_count == 2
+
+
+def test_manage_migrate_user_ids_command(mocker):
+    repository_class = mocker.patch("app.manage.PostRepository")
+    repository_class.return_value.migrate_user_ids.return_value = (10, 1)
+
+    manage.main(["migrate-user-ids"])
+
+    repository_class.return_value.migrate_user_ids.assert_called_once_with()
+
+
+async def test_unreact(post_service_servicer, mock_post_repository, mock_grpc_context):
+    post_id, user_id = uuid.uuid4(), uuid.uuid4()
+    mock_post_repository.unreact.return_value = (True, 6)
+
+    request = post_service_pb2.UnreactRequest(post_id=str(post_id), user_id=str(user_id))
+    response = await post_service_servicer.Unreact(request, mock_grpc_context)
+
+    mock_post_repository.unreact.assert_awaited_once_with(str(post_id), user_id)
+    post_service_servicer.like_counts.mark.assert_called_once_with(post_id)
+    assert (response.changed, response.like_count) == (True, 6)
+    mock_grpc_context.set_code.assert_not_called()
+
+
+async def test_unreact_without_reaction_or_post(post_service_servicer, mock_post_repository, mock_grpc_context):
+    request = post_service_pb2.UnreactRequest(post_id=str(uuid.uuid4()), user_id=str(uuid.uuid4()))
+
+    # Реакции не было: ничего не меняется, like_count поста не пересчитывается
+    mock_post_repository.unreact.return_value = (False, 6)
+    response = await post_service_servicer.Unreact(request, mock_grpc_context)
+    assert (response.changed, response.like_count) == (False, 6)
+    post_service_servicer.like_counts.mark.assert_not_called()
+    mock_grpc_context.set_code.assert_not_called()
+
+    mock_post_repository.unreact.return_value = None
+    await post_service_servicer.Unreact(request, mock_grpc_context)
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.NOT_FOUND)
+
+    mock_grpc_context.reset_mock()
+    request.user_id = "not-a-uuid"
+    await post_service_servicer.Unreact(request, mock_grpc_context)
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+async def test_repository_unreact_decrements_users_shard(repository, mocker):
+    post_id, user_id = uuid.uuid4(), uuid.uuid4()
+    mocker.patch.object(repository, "count_likes", return_value=4)
+    post_key = mocker.patch.object(repository, "_post_key", return_value=None)
+    execute = mocker.patch.object(
+        repository, "_execute", side_effect=[lwt_result(mocker, True), None, lwt_result(mocker, False)]
+    )
+
+    assert await repository.unreact(str(post_id), user_id) == (True, 4)
+    assert execute.await_args_list[1].args == (
+        repository._update_reaction_count, (-1, post_id, user_id.int % REACTION_COUNT_SHARDS)
+    )
+    post_key.assert_not_called()
+
+    # Удалять нечего, и поста нет
+    assert await repository.unreact(str(post_id), user_id) is None
+    assert execute.await_count == 3
+
+
+async def test_list_reactions(post_service_servicer, mock_post_repository, mock_grpc_context):
+    post_id, user_id = uuid.uuid4(), uuid.uuid4()
+    reaction = type("Row", (), {})()
+    reaction.user_id, reaction.reaction_type, reaction.created_at = user_id, "wow", datetime(2023, 1, 1)
+    mock_post_repository.list_reactions.return_value = ([reaction], "next")
+
+    request = post_service_pb2.ListReactionsRequest(post_id=str(post_id), page_size=5000)
+    response = await post_service_servicer.ListReactions(request, mock_grpc_context)
+
+    # Размер страницы ограничен сверху
+    mock_post_repository.list_reactions.assert_awaited_once_with(str(post_id), page_size=1000, cursor=None)
+    assert [(r.user_id, r.reaction_type) for r in response.reactions] == [(user_id.bytes, "wow")]
+    assert response.reactions[0].created_at.ToDatetime() == datetime(2023, 1, 1)
+    assert response.next_cursor == "next"
+
+
+async def test_list_reactions_invalid_cursor(post_service_servicer, repository, mock_grpc_context, mocker):
+    post_service_servicer.post_repository = repository
+    execute = mocker.patch.object(repository, "_execute")
+    post_id = uuid.uuid4()
+
+    # Курсор другого поста не принимается, так же как мусор
+    for cursor in ("garbage", encode_cursor(b"paging-state", str(uuid.uuid4()))):
+        mock_grpc_context.reset_mock()
+        request = post_service_pb2.ListReactionsRequest(post_id=str(post_id), cursor=cursor)
+        response = await post_service_servicer.ListReactions(request, mock_grpc_context)
+        mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+        assert response == post_service_pb2.ListReactionsResponse()
+    execute.assert_not_called()
+
+
+async def test_list_reactions_paging_state_rejected_by_cassandra(post_service_servicer, mock_post_repository, mock_grpc_context):
+    mock_post_repository.list_reactions.side_effect = InvalidRequest("Invalid value for the paging state")
+
+    request = post_service_pb2.ListReactionsRequest(post_id=str(uuid.uuid4()), cursor="abc")
+    await post_service_servicer.ListReactions(request, mock_grpc_context)
+
+    mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+
+def test_serve_refuses_default_cursor_secret(mocker):
+    # Курсоры, подписанные ключом по умолчанию, может подделать кто угодно
+    mocker.patch("app.main.CURSOR_SECRET", b"cursor-secret")
+    with pytest.raises(RuntimeError, match="CURSOR_SECRET"):
+        check_cursor_secret()
+
+    mocker.patch("app.main.CURSOR_SECRET", b"deployment-secret")
+    check_cursor_secret()
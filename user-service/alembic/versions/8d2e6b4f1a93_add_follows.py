@@ -0,0 +1,59 @@
+"""add follows table and follower counts
+
+Revision ID: 8d2e6b4f1a93
+Revises: 3c1f9a7d52e4
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d2e6b4f1a93"
+down_revision: Union[str, None] = "3c1f9a7d52e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "follows",
+        sa.Column("follower_id", sa.UUID(), nullable=False),
+        sa.Column("followee_id", sa.UUID(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["follower_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["followee_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("follower_id", "followee_id"),
+    )
+    op.create_index(
+        "ix_follows_follower_created",
+        "follows",
+        ["follower_id", "created_at", "followee_id"],
+    )
+    op.create_index(
+        "ix_follows_followee_created",
+        "follows",
+        ["followee_id", "created_at", "follower_id"],
+    )
+    op.add_column(
+        "users",
+        sa.Column("follower_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "users",
+        sa.Column("following_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "following_count")
+    op.drop_column("users", "follower_count")
+    op.drop_index("ix_follows_followee_created", table_name="follows")
+    op.drop_index("ix_follows_follower_created", table_name="follows")
+    op.drop_table("follows")
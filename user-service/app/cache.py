@@ -0,0 +1,76 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.models import UserDB
+
+# password_hash never leaves the database through the cache
+CACHED_COLUMNS = [
+    column.key for column in UserDB.__table__.columns if column.key != "password_hash"
+]
+
+
+class UserCache:
+    """In-process read-through cache of user rows, keyed by id and by login.
+
+    Entries are detached snapshots of the row, kept for at most `ttl` seconds
+    and evicted least recently used beyond `max_size`. Invalidation only
+    reaches this process, so other workers may serve a stale profile for up
+    to `ttl` seconds after an update.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_by_id(self, user_id) -> Optional[UserDB]:
+        return self._get(f"id:{user_id}")
+
+    def get_by_login(self, login: str) -> Optional[UserDB]:
+        return self._get(f"login:{login}")
+
+    def set(self, user: UserDB):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        snapshot = {key: getattr(user, key) for key in CACHED_COLUMNS}
+        expires_at = time.monotonic() + self.ttl
+        for key in (f"id:{user.id}", f"login:{user.login}"):
+            self._entries[key] = (expires_at, snapshot)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id=None, login: Optional[str] = None):
+        if user_id is not None:
+            self._entries.pop(f"id:{user_id}", None)
+        if login is not None:
+            self._entries.pop(f"login:{login}", None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _get(self, key: str) -> Optional[UserDB]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # A fresh transient object, so callers can't modify the cache
+                return UserDB(**snapshot)
+            del self._entries[key]
+        self.misses += 1
+        return None
@@ -0,0 +1,132 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import FollowDB, UserDB
+
+
+def encode_cursor(created_at: datetime, user_id: uuid.UUID) -> str:
+    """Opaque keyset cursor: the position of the last row of a page"""
+    raw = f"{created_at.isoformat()}|{user_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Raises ValueError for anything encode_cursor didn't produce"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, user_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(user_id)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def follow(db: AsyncSession, follower_id: uuid.UUID, followee_id: uuid.UUID) -> bool:
+    """Add the edge and bump both counters; False if it already existed"""
+    if await db.get(FollowDB, (follower_id, followee_id)) is not None:
+        return False
+    db.add(FollowDB(follower_id=follower_id, followee_id=followee_id))
+    try:
+        await db.flush()
+    except IntegrityError:
+        # A concurrent request added the same edge first
+        await db.rollback()
+        return False
+    await _change_counts(db, follower_id, followee_id, 1)
+    await db.commit()
+    return True
+
+
+async def unfollow(db: AsyncSession, follower_id: uuid.UUID, followee_id: uuid.UUID) -> bool:
+    """Remove the edge and decrement both counters; False if there was none"""
+    result = await db.execute(
+        delete(FollowDB).where(
+            FollowDB.follower_id == follower_id, FollowDB.followee_id == followee_id
+        )
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        return False
+    await _change_counts(db, follower_id, followee_id, -1)
+    await db.commit()
+    return True
+
+
+async def _change_counts(
+    db: AsyncSession, follower_id: uuid.UUID, followee_id: uuid.UUID, delta: int
+):
+    # Relative updates, so concurrent follows of one account don't lose counts
+    await db.execute(
+        update(UserDB)
+        .where(UserDB.id == follower_id)
+        .values(following_count=UserDB.following_count + delta)
+    )
+    await db.execute(
+        update(UserDB)
+        .where(UserDB.id == followee_id)
+        .values(follower_count=UserDB.follower_count + delta)
+    )
+
+
+async def list_followers(
+    db: AsyncSession, user_id: uuid.UUID, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """Who follows user_id, most recent first"""
+    return await _list_page(
+        db, FollowDB.followee_id, FollowDB.follower_id, user_id, limit, cursor
+    )
+
+
+async def list_following(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    limit: int,
+    cursor: Optional[str] = None,
+    min_follower_count: int = 0,
+) -> Tuple[List[dict], Optional[str]]:
+    """Who user_id follows, most recent first, optionally only big accounts"""
+    return await _list_page(
+        db, FollowDB.follower_id, FollowDB.followee_id, user_id, limit, cursor,
+        min_follower_count,
+    )
+
+
+async def _list_page(
+    db, owner_column, other_column, user_id, limit, cursor, min_follower_count=0
+):
+    # Keyset pagination over (created_at, other id): every page is a range
+    # scan of the direction's index, no OFFSET and no count of the list
+    query = (
+        select(
+            UserDB.id, UserDB.login, UserDB.first_name, UserDB.last_name,
+            FollowDB.created_at,
+        )
+        .join(UserDB, UserDB.id == other_column)
+        .where(owner_column == user_id)
+        .order_by(FollowDB.created_at.desc(), other_column.desc())
+        .limit(limit + 1)
+    )
+    if min_follower_count:
+        query = query.where(UserDB.follower_count >= min_follower_count)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(FollowDB.created_at, other_column) < tuple_(created_at, last_id)
+        )
+
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    users = [
+        {"id": row.id, "login": row.login, "first_name": row.first_name,
+         "last_name": row.last_name}
+        for row in rows
+    ]
+    return users, next_cursor
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Date, DateTime, Boolean, Integer, UUID
+from sqlalchemy import Column, String, Date, DateTime, Boolean, Integer, UUID, ForeignKey, Index
 from sqlalchemy.orm import declarative_base
 import os
 
@@ -25,3 +25,29 @@ class UserDB(Base):
                         onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    # Bumped to revoke all access tokens issued to the user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # Maintained by follow/unfollow in the same transaction as the follows row
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
+    following_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class FollowDB(Base):
+    """An edge of the follow graph: follower_id follows followee_id"""
+
+    __tablename__ = "follows"
+
+    follower_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    followee_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # One index per direction, both in list order, so a page of following
+    # or followers is a single index range scan however large the list is
+    __table_args__ = (
+        Index("ix_follows_follower_created", "follower_id", "created_at", "followee_id"),
+        Index("ix_follows_followee_created", "followee_id", "created_at", "follower_id"),
+    )
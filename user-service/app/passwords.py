@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# scrypt cost settings; changing them makes existing hashes get rehashed on login
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "16384"))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+# Threads available for hashing, so the event loop never runs the KDF itself
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+
+SALT_LENGTH = 16
+HASH_LENGTH = 32
+SCHEME = "scrypt"
+
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=128 * r * (n + p + 2),
+        dklen=HASH_LENGTH,
+    )
+
+
+def get_password_hash(
+    password: str,
+    n: Optional[int] = None,
+    r: Optional[int] = None,
+    p: Optional[int] = None,
+) -> str:
+    """Hash a password with a random salt using scrypt"""
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = secrets.token_bytes(SALT_LENGTH)
+    password_hash = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${n}${r}${p}${salt.hex()}${password_hash.hex()}"
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a scrypt or legacy salted SHA-256 hash"""
+    if not hashed_password or "$" not in hashed_password:
+        return False
+
+    parts = hashed_password.split("$")
+    if parts[0] == SCHEME and len(parts) == 6:
+        try:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            salt, stored_hash = bytes.fromhex(parts[4]), bytes.fromhex(parts[5])
+        except ValueError:
+            return False
+        password_hash = _scrypt(plain_password, salt, n, r, p)
+        return hmac.compare_digest(password_hash, stored_hash)
+
+    # Legacy format: "<salt>$<sha256(password + salt)>"
+    salt, stored_hash = hashed_password.split("$", 1)
+    password_hash = hashlib.sha256((plain_password + salt).encode()).hexdigest()
+    return hmac.compare_digest(password_hash, stored_hash)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash is legacy SHA-256 or uses other cost settings than now"""
+    return not hashed_password.startswith(
+        f"{SCHEME}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$"
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, verify_password, plain_password, hashed_password
+    )
@@ -0,0 +1,61 @@
+"""Password hashing benchmark.
+
+Reports how many logins per second one user-service process can verify
+for each scrypt cost setting, using the same bounded thread pool size as
+the service.
+
+    python -m benchmarks.bench_passwords --workers 4 --seconds 3
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.passwords import PASSWORD_HASH_WORKERS, get_password_hash, verify_password
+
+COST_SETTINGS = [
+    (2**12, 8, 1),
+    (2**13, 8, 1),
+    (2**14, 8, 1),
+    (2**15, 8, 1),
+    (2**16, 8, 1),
+]
+
+
+def logins_per_second(hashed: str, workers: int, seconds: float) -> float:
+    deadline = time.perf_counter() + seconds
+
+    def worker() -> int:
+        done = 0
+        while time.perf_counter() < deadline:
+            verify_password("benchmark-password", hashed)
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        total = sum(executor.map(lambda _: worker(), range(workers)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=PASSWORD_HASH_WORKERS)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'N':>8} {'r':>3} {'p':>3} {'ms/hash':>9} {'logins/sec':>11}")
+    for n, r, p in COST_SETTINGS:
+        hashed = get_password_hash("benchmark-password", n=n, r=r, p=p)
+        started = time.perf_counter()
+        verify_password("benchmark-password", hashed)
+        single_ms = (time.perf_counter() - started) * 1000
+        rate = logins_per_second(hashed, args.workers, args.seconds)
+        print(f"{n:>8} {r:>3} {p:>3} {single_ms:>9.1f} {rate:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,51 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, event
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app.main import app, get_db
+from app.main import app, get_db, user_cache
 from app.models import Base
 
-TEST_DATABASE_URL = "sqlite:///:memory:"
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    user_cache.clear()
+    yield
+    user_cache.clear()
 
-@pytest.fixture(scope="session")
-def db_engine():
-    # Use filelock to prevent SQLite multithreading issues
-    engine = create_engine(
-        TEST_DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool
-    )
+@pytest.fixture(scope="function")
+def db_path(tmp_path):
+    # A file database per test: the app's async engine and the test's sync
+    # session see the same data, and every test starts from empty tables
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
     Base.metadata.create_all(bind=engine)
-    yield engine
-    Base.metadata.drop_all(bind=engine)
+    yield path
     engine.dispose()
 
 @pytest.fixture(scope="function")
-def db_session(db_engine):
-    connection = db_engine.connect()
-    
-    # Begin a nested transaction (using SAVEPOINT)
-    transaction = connection.begin_nested()
-    Session = sessionmaker(bind=connection)
+def db_session(db_path):
+    engine = create_engine(f"sqlite:///{db_path}", poolclass=NullPool)
+    Session = sessionmaker(bind=engine)
     session = Session()
-
-    # Allow database connection to be reused for nested transactions
-    @event.listens_for(session, "after_transaction_end")
-    def restart_savepoint(session, transaction):
-        if transaction.nested and not transaction._parent.nested:
-            session.begin_nested()
-
     yield session
-    
-    # Cleanup
     session.close()
-    transaction.rollback()
-    connection.close()
+    engine.dispose()
 
 @pytest.fixture
-def client(db_session):
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            db_session.close()
-    
+def client(db_path):
+    # NullPool: TestClient may run requests on different event loops
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    TestingSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override_get_db():
+        async with TestingSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as c:
         yield c
@@ -0,0 +1,52 @@
+import hashlib
+
+from app.models import UserDB
+from app.passwords import get_password_hash, needs_rehash, verify_password
+
+
+def legacy_hash(password, salt="0123456789abcdef"):
+    return f"{salt}${hashlib.sha256((password + salt).encode()).hexdigest()}"
+
+
+def test_password_hash_roundtrip():
+    """Test that scrypt hashes verify only the original password"""
+    hashed = get_password_hash("secretpass123")
+    assert hashed.startswith("scrypt$")
+    assert verify_password("secretpass123", hashed)
+    assert not verify_password("wrongpass123", hashed)
+    assert not needs_rehash(hashed)
+
+
+def test_legacy_hash_still_verifies():
+    """Test that legacy salted SHA-256 hashes are accepted and flagged"""
+    hashed = legacy_hash("secretpass123")
+    assert verify_password("secretpass123", hashed)
+    assert not verify_password("wrongpass123", hashed)
+    assert needs_rehash(hashed)
+
+
+def test_cost_change_needs_rehash():
+    """Test that hashes made with other cost settings are flagged"""
+    assert needs_rehash(get_password_hash("secretpass123", n=1024))
+
+
+def test_login_rehashes_legacy_password(client, db_session):
+    """Test that logging in upgrades a legacy hash to scrypt"""
+    client.post("/register", json={
+        "login": "legacyuser",
+        "email": "legacy@example.com",
+        "password": "legacypass123"
+    })
+    user = db_session.query(UserDB).filter(UserDB.login == "legacyuser").first()
+    user.password_hash = legacy_hash("legacypass123")
+    db_session.commit()
+
+    response = client.post("/token", data={
+        "username": "legacyuser",
+        "password": "legacypass123"
+    })
+    assert response.status_code == 200
+
+    user = db_session.query(UserDB).filter(UserDB.login == "legacyuser").first()
+    assert user.password_hash.startswith("scrypt$")
+    assert verify_password("legacypass123", user.password_hash)
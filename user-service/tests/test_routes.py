@@ -1,6 +1,8 @@
 import pytest
 from fastapi.testclient import TestClient
 import json
+from jose import jwt
+from app.main import create_access_token, user_cache
 from app.models import UserDB
 
 def test_register_user_success(client):
@@ -55,6 +57,92 @@ def test_login_success(client):
     assert "access_token" in data
     assert data["token_type"] == "bearer"
 
+def test_login_token_carries_user_id(client):
+    """Test that the access token carries the user id for local verification"""
+    registered = client.post("/register", json={
+        "login": "claimsuser",
+        "email": "claims@example.com",
+        "password": "claimspass123"
+    }).json()
+
+    response = client.post("/token", data={
+        "username": "claimsuser",
+        "password": "claimspass123"
+    })
+    claims = jwt.get_unverified_claims(response.json()["access_token"])
+    assert claims["sub"] == "claimsuser"
+    assert claims["user_id"] == registered["id"]
+    assert claims["tv"] == 0
+
+def test_legacy_login_only_token_accepted(client):
+    """Test that tokens issued before user_id claims still work"""
+    client.post("/register", json={
+        "login": "legacytoken",
+        "email": "legacytoken@example.com",
+        "password": "legacypass123"
+    })
+    token = create_access_token(data={"sub": "legacytoken"})
+
+    response = client.get("/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["login"] == "legacytoken"
+
+def test_password_change_revokes_tokens(client):
+    """Test that changing the password invalidates previously issued tokens"""
+    client.post("/register", json={
+        "login": "revokeuser",
+        "email": "revoke@example.com",
+        "password": "revokepass123"
+    })
+    token = client.post("/token", data={
+        "username": "revokeuser",
+        "password": "revokepass123"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.put("/me", json={"password": "newrevokepass123"}, headers=headers)
+    assert response.status_code == 200
+
+    assert client.get("/me", headers=headers).status_code == 401
+    new_token = client.post("/token", data={
+        "username": "revokeuser",
+        "password": "newrevokepass123"
+    }).json()["access_token"]
+    response = client.get("/me", headers={"Authorization": f"Bearer {new_token}"})
+    assert response.status_code == 200
+
+def test_password_change_revokes_legacy_tokens(client):
+    """Test that tokens without a version are rejected after a password change"""
+    client.post("/register", json={
+        "login": "legacyrevoke",
+        "email": "legacyrevoke@example.com",
+        "password": "legacyrevoke123"
+    })
+    legacy_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': 'legacyrevoke'})}"}
+    token = client.post("/token", data={
+        "username": "legacyrevoke",
+        "password": "legacyrevoke123"
+    }).json()["access_token"]
+
+    response = client.put(
+        "/me", json={"password": "newlegacyrevoke123"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert client.get("/me", headers=legacy_headers).status_code == 401
+
+def test_token_version_follows_password_changes(client):
+    """Test that the internal token version endpoint tracks password changes"""
+    user_id, headers = register_and_login(client, "versioned")
+    url = f"/internal/users/{user_id}/token-version"
+    assert client.get(url).json() == {"token_version": 0}
+
+    client.put("/me", json={"password": "newversioned123"}, headers=headers)
+    assert client.get(url).json() == {"token_version": 1}
+    assert client.get(
+        "/internal/users/123e4567-e89b-12d3-a456-426614174000/token-version"
+    ).status_code == 404
+
 def test_login_invalid_credentials(client):
     """Test login with invalid credentials"""
     response = client.post("/token", data={
@@ -93,3 +181,150 @@ def test_update_user_profile(client):
     data = response.json()
     assert data["email"] == "newemail@example.com"
     assert data["login"] == "updateuser"  # Original data preserved
+
+def test_me_served_from_user_cache(client):
+    """Test that repeated /me calls hit the user cache and updates invalidate it"""
+    client.post("/register", json={
+        "login": "cacheuser",
+        "email": "cache@example.com",
+        "password": "cachepass123"
+    })
+    token = client.post("/token", data={
+        "username": "cacheuser",
+        "password": "cachepass123"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    user_cache.clear()
+    before = user_cache.stats()
+    assert client.get("/me", headers=headers).status_code == 200
+    assert client.get("/me", headers=headers).status_code == 200
+    after = user_cache.stats()
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+    client.put("/me", json={"first_name": "Cached"}, headers=headers)
+    response = client.get("/me", headers=headers)
+    assert response.json()["first_name"] == "Cached"
+
+def test_users_batch(client):
+    """Test that many users are resolved at once with public fields only"""
+    ids = []
+    for i in range(3):
+        response = client.post("/register", json={
+            "login": f"batchuser{i}",
+            "email": f"batch{i}@example.com",
+            "password": "batchpass123",
+            "first_name": f"Batch{i}"
+        })
+        ids.append(response.json()["id"])
+    unknown_id = "00000000-0000-0000-0000-000000000000"
+
+    response = client.post("/users/batch", json={"ids": ids[:2] + [unknown_id, ids[0]]})
+    assert response.status_code == 200
+    users = response.json()["users"]
+    assert sorted(u["id"] for u in users) == sorted(ids[:2])
+    assert all("email" not in u for u in users)
+    assert {u["login"] for u in users} == {"batchuser0", "batchuser1"}
+
+def test_users_batch_limit(client):
+    """Test that oversized batches are rejected"""
+    ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(501)]
+    response = client.post("/users/batch", json={"ids": ids})
+    assert response.status_code == 422
+
+def register_and_login(client, login):
+    user_id = client.post("/register", json={
+        "login": login,
+        "email": f"{login}@example.com",
+        "password": "followpass123"
+    }).json()["id"]
+    token = client.post("/token", data={
+        "username": login,
+        "password": "followpass123"
+    }).json()["access_token"]
+    return user_id, {"Authorization": f"Bearer {token}"}
+
+def test_follow_unfollow_maintains_counts(client):
+    """Test that follow is idempotent and keeps both counters in step"""
+    alice_id, alice = register_and_login(client, "alice")
+    bob_id, _ = register_and_login(client, "bob")
+
+    assert client.put(f"/users/{bob_id}/follow", headers=alice).status_code == 204
+    assert client.put(f"/users/{bob_id}/follow", headers=alice).status_code == 204
+    assert client.get(f"/users/{bob_id}/follow-counts").json() == {
+        "follower_count": 1, "following_count": 0
+    }
+    assert client.get("/me", headers=alice).json()["following_count"] == 1
+    following = client.get(f"/users/{alice_id}/following").json()
+    assert [u["id"] for u in following["users"]] == [bob_id]
+
+    assert client.delete(f"/users/{bob_id}/follow", headers=alice).status_code == 204
+    assert client.delete(f"/users/{bob_id}/follow", headers=alice).status_code == 204
+    assert client.get(f"/users/{bob_id}/follow-counts").json() == {
+        "follower_count": 0, "following_count": 0
+    }
+    assert client.get(f"/users/{bob_id}/followers").json()["users"] == []
+
+def test_follow_invalidates_both_users_by_login(client):
+    """Test that follow counts are fresh for both users, also via login-only tokens"""
+    _, alice = register_and_login(client, "alicecache")
+    bob_id, _ = register_and_login(client, "bobcache")
+    # Login-only tokens are resolved through the cache entry keyed by login
+    bob = {"Authorization": f"Bearer {create_access_token(data={'sub': 'bobcache'})}"}
+    assert client.get("/me", headers=bob).json()["follower_count"] == 0
+
+    client.put(f"/users/{bob_id}/follow", headers=alice)
+    assert client.get("/me", headers=bob).json()["follower_count"] == 1
+
+    client.delete(f"/users/{bob_id}/follow", headers=alice)
+    assert client.get("/me", headers=bob).json()["follower_count"] == 0
+
+def test_following_filtered_by_follower_count(client):
+    """Test that following can be narrowed to accounts with many followers"""
+    reader_id, reader = register_and_login(client, "reader")
+    star_id, _ = register_and_login(client, "popular")
+    quiet_id, _ = register_and_login(client, "quiet")
+    client.put(f"/users/{star_id}/follow", headers=reader)
+    client.put(f"/users/{quiet_id}/follow", headers=reader)
+    _, fan = register_and_login(client, "anotherfan")
+    client.put(f"/users/{star_id}/follow", headers=fan)
+
+    response = client.get(
+        f"/users/{reader_id}/following", params={"min_follower_count": 2}
+    )
+    assert [u["id"] for u in response.json()["users"]] == [star_id]
+
+def test_follow_rejects_self_and_unknown_users(client):
+    """Test that users can't follow themselves or accounts that don't exist"""
+    alice_id, alice = register_and_login(client, "selffollow")
+    unknown_id = "00000000-0000-0000-0000-000000000000"
+
+    assert client.put(f"/users/{alice_id}/follow", headers=alice).status_code == 400
+    assert client.put(f"/users/{unknown_id}/follow", headers=alice).status_code == 404
+    assert client.put(f"/users/{alice_id}/follow").status_code == 401
+
+def test_followers_keyset_pagination(client):
+    """Test that followers come newest first, a page at a time, without repeats"""
+    star_id, _ = register_and_login(client, "star")
+    fan_ids = []
+    for i in range(5):
+        fan_id, fan = register_and_login(client, f"fan{i}")
+        client.put(f"/users/{star_id}/follow", headers=fan)
+        fan_ids.append(fan_id)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/users/{star_id}/followers", params=params).json()
+        assert len(page["users"]) <= 2
+        seen += [u["id"] for u in page["users"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == fan_ids[::-1]
+
+    response = client.get(f"/users/{star_id}/followers", params={"cursor": "bogus"})
+    assert response.status_code == 400